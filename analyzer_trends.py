@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Trends across Dart analyzer logs
+
+Reads analyzer dumps such as analyze.txt and linter_issues.txt (written by
+PowerShell as UTF-16, with CRLF and PowerShell error noise) in whatever
+encoding they are in, streaming line by line. Each parsed issue becomes
+(severity, rule, file, line), and each ingested log becomes a run in a
+local SQLite database, .oxbar/cache/analyzer-trends.db. Queries then answer
+from indexes instead of re-grepping the logs:
+
+  - issues per rule or per directory in a run;
+  - what changed since the previous run of the same log, per rule, with the
+    issues that appeared or went away. Issues are matched on rule, file and
+    message, not line numbers, so edits above an issue do not count as a
+    fix plus a new issue.
+
+Understood line formats: `flutter analyze` (both `msg - file:l:c - rule` and
+the older `file:l:c - msg - rule` order) and machine format
+(`dart analyze --format=machine`, as fix_issues.py stores it).
+
+Usage:
+    python3 analyzer_trends.py [--db PATH] COMMAND
+
+    ingest LOG ... [--label TEXT] [--encoding NAME] [--force]
+                            Add each log as a run (skipped if identical to
+                            the latest run of the same log unless --force),
+                            then print the change since the previous run
+    runs                    List the recorded runs
+    rules [--run ID]        Issues per rule (default: the latest run)
+    dirs [--run ID] [--depth N]
+                            Issues per directory, N levels deep (default 2)
+    diff [RUN [RUN]] [--limit N]
+                            Changes between two runs (default: the latest
+                            run and the previous run of the same log)
+"""
+import argparse
+import codecs
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from fix_issues import split_machine_line
+
+DB_PATH = Path(__file__).parent / ".oxbar" / "cache" / "analyzer-trends.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    source      TEXT NOT NULL,
+    label       TEXT,
+    recorded_at TEXT NOT NULL,
+    sha256      TEXT NOT NULL,
+    encoding    TEXT NOT NULL,
+    issues      INTEGER NOT NULL DEFAULT 0,
+    reported    INTEGER            -- "N issues found" from the log, if any
+);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id   INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    severity TEXT NOT NULL,
+    rule     TEXT NOT NULL,
+    file     TEXT NOT NULL,
+    dir      TEXT NOT NULL,
+    line     INTEGER NOT NULL,
+    message  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_by_rule ON issues (run_id, rule);
+CREATE INDEX IF NOT EXISTS issues_by_dir ON issues (run_id, dir);
+CREATE INDEX IF NOT EXISTS issues_by_key ON issues (run_id, rule, file, message);
+CREATE INDEX IF NOT EXISTS runs_by_source ON runs (source, id);
+"""
+
+# "   info - <message> - lib\a.dart:70:27 - rule" and the older
+# "  error - lib\a.dart:2:8 - <message> - rule"
+_HUMAN = re.compile(r"^\s*(?P<severity>error|warning|info|hint|lint) - (?P<body>.*) - "
+                    r"(?P<rule>[a-z0-9_]+)\s*$")
+_LOCATION_LAST = re.compile(r"^(?P<message>.*) - (?P<file>[^ ]+?):(?P<line>\d+):\d+$")
+_LOCATION_FIRST = re.compile(r"^(?P<file>[^ ]+?):(?P<line>\d+):\d+ - (?P<message>.*)$")
+_REPORTED = re.compile(r"(\d+) issues? found")
+
+_BOMS = ((codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+         (codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+         (codecs.BOM_UTF16_BE, "utf-16"))
+
+
+# ── reading logs ──────────────────────────────────────────────────────────────
+
+def detect_encoding(head):
+    """Encoding of a log from its first bytes: BOM, else NUL pattern, else UTF-8."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if head[1::2].count(0) > len(head) // 4:
+        return "utf-16-le"
+    if head[0::2].count(0) > len(head) // 4:
+        return "utf-16-be"
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte sequence cut off by the end of head is still UTF-8.
+        if e.start < len(head) - 3:
+            return "cp1252"
+    return "utf-8"
+
+
+def parse_line(line):
+    """(severity, rule, file, line, message) for an issue line, else None."""
+    match = _HUMAN.match(line)
+    if match:
+        body = match["body"]
+        location = _LOCATION_LAST.match(body) or _LOCATION_FIRST.match(body)
+        if not location:
+            return None
+        return (match["severity"], match["rule"], location["file"].replace("\\", "/"),
+                int(location["line"]), location["message"])
+    if line.count("|") >= 7:
+        fields = split_machine_line(line.strip())
+        if len(fields) == 8 and fields[4].isdigit():
+            severity, _, rule, file, line_num, _, _, message = fields
+            return (severity.lower(), rule.lower(), file.replace("\\", "/"),
+                    int(line_num), message)
+    return None
+
+
+def read_log(path, encoding=None):
+    """Stream (severity, rule, file, line, message) from a log.
+
+    Returns (issues iterator, encoding, stats); stats gets "sha256" and
+    "reported" once the iterator is exhausted.
+    """
+    binary = open(path, "rb")
+    head = binary.peek(4096)[:4096] if hasattr(binary, "peek") else b""
+    encoding = encoding or detect_encoding(head)
+    stats = {}
+
+    def issues():
+        digest = hashlib.sha256()
+        with binary:
+            raw = io.BufferedReader(_Hashing(binary, digest), 1 << 16)
+            text = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=None)
+            for line in text:
+                issue = parse_line(line)
+                if issue:
+                    yield issue
+                elif "issues found" in line or "issue found" in line:
+                    reported = _REPORTED.search(line)
+                    if reported:
+                        stats["reported"] = int(reported.group(1))
+        stats["sha256"] = digest.hexdigest()
+
+    return issues(), encoding, stats
+
+
+class _Hashing(io.RawIOBase):
+    """Binary stream that hashes what is read through it."""
+
+    def __init__(self, raw, digest):
+        self.raw, self.digest = raw, digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        if n:
+            self.digest.update(memoryview(buffer)[:n])
+        return n
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ── trend database ────────────────────────────────────────────────────────────
+
+def open_db(path=DB_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def _directory(file):
+    return file.rsplit("/", 1)[0] if "/" in file else "."
+
+
+def latest_run(db, source=None):
+    if source is None:
+        return db.execute("SELECT * FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    return db.execute("SELECT * FROM runs WHERE source = ? ORDER BY id DESC LIMIT 1",
+                      (source,)).fetchone()
+
+
+def previous_run(db, run):
+    return db.execute("SELECT * FROM runs WHERE source = ? AND id < ? ORDER BY id DESC "
+                      "LIMIT 1", (run["source"], run["id"])).fetchone()
+
+
+def get_run(db, run_id):
+    run = db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if run is None:
+        raise SystemExit(f"ERROR: No run {run_id}")
+    return run
+
+
+def ingest(db, path, label=None, encoding=None, force=False):
+    """Record the log at path as a run; return (run row, added?)."""
+    source = Path(path).name
+    latest = latest_run(db, source)
+    if latest is not None and not force and latest["sha256"] == file_sha256(path):
+        return latest, False
+
+    issues, encoding, stats = read_log(path, encoding)
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (source, label, recorded_at, sha256, encoding) "
+            "VALUES (?, ?, ?, '', ?)",
+            (source, label, time.strftime("%Y-%m-%dT%H:%M:%S"), encoding)).lastrowid
+        db.executemany(
+            "INSERT INTO issues (run_id, severity, rule, file, dir, line, message) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((run_id, severity, rule, file, _directory(file), line, message)
+             for severity, rule, file, line, message in issues))
+        db.execute("UPDATE runs SET sha256 = ?, reported = ?, "
+                   "issues = (SELECT count(*) FROM issues WHERE run_id = ?) WHERE id = ?",
+                   (stats["sha256"], stats.get("reported"), run_id, run_id))
+    return get_run(db, run_id), True
+
+
+def rule_counts(db, run_id):
+    return db.execute("SELECT rule, min(severity) AS severity, count(*) AS n FROM issues "
+                      "WHERE run_id = ? GROUP BY rule ORDER BY n DESC, rule",
+                      (run_id,)).fetchall()
+
+
+def dir_counts(db, run_id, depth=2):
+    counts = {}
+    for row in db.execute("SELECT dir, count(*) AS n FROM issues WHERE run_id = ? "
+                          "GROUP BY dir", (run_id,)):
+        prefix = "/".join(row["dir"].split("/")[:depth])
+        counts[prefix] = counts.get(prefix, 0) + row["n"]
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def diff_runs(db, old_id, new_id):
+    """[(rule, file, message, delta)] for issues whose count changed, new - old."""
+    return db.execute(
+        "SELECT rule, file, message, "
+        "       sum(CASE WHEN run_id = :new THEN 1 ELSE -1 END) AS delta "
+        "FROM issues WHERE run_id IN (:old, :new) "
+        "GROUP BY rule, file, message HAVING delta != 0 "
+        "ORDER BY rule, file, message",
+        {"old": old_id, "new": new_id}).fetchall()
+
+
+# ── output ────────────────────────────────────────────────────────────────────
+
+def _describe(run):
+    label = f" [{run['label']}]" if run["label"] else ""
+    return f"run {run['id']} {run['source']}{label} {run['recorded_at']}"
+
+
+def print_diff(db, old, new, limit=20):
+    changes = diff_runs(db, old["id"], new["id"])
+    print(f"{_describe(old)} ({old['issues']}) -> {_describe(new)} ({new['issues']}): "
+          f"{new['issues'] - old['issues']:+d}")
+    if not changes:
+        print("  No changes.")
+        return
+    by_rule = {}
+    for change in changes:
+        added, fixed = by_rule.get(change["rule"], (0, 0))
+        if change["delta"] > 0:
+            by_rule[change["rule"]] = (added + change["delta"], fixed)
+        else:
+            by_rule[change["rule"]] = (added, fixed - change["delta"])
+    print(f"\n  {'rule':<44} {'new':>6} {'fixed':>6}")
+    for rule, (added, fixed) in sorted(by_rule.items(), key=lambda item: -sum(item[1])):
+        print(f"  {rule:<44} {added:>6} {fixed:>6}")
+    for heading, sign in (("New", 1), ("Fixed", -1)):
+        rows = [c for c in changes if c["delta"] * sign > 0]
+        if rows:
+            print(f"\n  {heading} ({sum(abs(c['delta']) for c in rows)}):")
+            for c in rows[:limit]:
+                count = f" x{abs(c['delta'])}" if abs(c["delta"]) > 1 else ""
+                print(f"    {c['rule']:<32} {c['file']}{count}: {c['message'][:80]}")
+            if len(rows) > limit:
+                print(f"    ... and {len(rows) - limit} more (--limit)")
+
+
+def _run_or_latest(db, run_id):
+    if run_id is not None:
+        return get_run(db, run_id)
+    run = latest_run(db)
+    if run is None:
+        raise SystemExit("ERROR: No runs recorded yet; run `ingest` first.")
+    return run
+
+
+def _stdout_closed():
+    # Same as tooling/query_icon_inventory.py's _stdout_closed; see there.
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and compare Dart analyzer logs")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest")
+    ingest_parser.add_argument("logs", nargs="+", type=Path)
+    ingest_parser.add_argument("--label", default=None)
+    ingest_parser.add_argument("--encoding", default=None)
+    ingest_parser.add_argument("--force", action="store_true")
+    commands.add_parser("runs")
+    rules_parser = commands.add_parser("rules")
+    rules_parser.add_argument("--run", type=int, default=None)
+    dirs_parser = commands.add_parser("dirs")
+    dirs_parser.add_argument("--run", type=int, default=None)
+    dirs_parser.add_argument("--depth", type=int, default=2)
+    diff_parser = commands.add_parser("diff")
+    diff_parser.add_argument("runs", nargs="*", type=int)
+    diff_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = open_db(args.db)
+    try:
+        if args.command == "ingest":
+            for log in args.logs:
+                start = time.perf_counter()
+                try:
+                    run, added = ingest(db, log, args.label, args.encoding, args.force)
+                except (OSError, LookupError) as e:
+                    print(f"ERROR: {log}: {e}", file=sys.stderr)
+                    sys.exit(1)
+                if not added:
+                    print(f"{log}: unchanged since {_describe(run)}; skipped (--force to add)")
+                    continue
+                reported = run["reported"]
+                check = "" if reported is None or reported == run["issues"] else \
+                    f" (log reports {reported})"
+                print(f"{log}: {run['issues']} issues{check} from {run['encoding']} "
+                      f"in {time.perf_counter() - start:.2f}s -> {_describe(run)}")
+                old = previous_run(db, run)
+                if old is not None:
+                    print_diff(db, old, run, limit=10)
+                print()
+        elif args.command == "runs":
+            for run in db.execute("SELECT * FROM runs ORDER BY id"):
+                print(f"{run['id']:>4}  {run['recorded_at']}  {run['source']:<24} "
+                      f"{run['issues']:>6}  {run['label'] or ''}")
+        elif args.command == "rules":
+            run = _run_or_latest(db, args.run)
+            print(f"Issues per rule in {_describe(run)}:")
+            for row in rule_counts(db, run["id"]):
+                print(f"  {row['n']:>6}  {row['severity']:<8} {row['rule']}")
+        elif args.command == "dirs":
+            run = _run_or_latest(db, args.run)
+            print(f"Issues per directory in {_describe(run)}:")
+            for directory, n in dir_counts(db, run["id"], args.depth):
+                print(f"  {n:>6}  {directory}")
+        else:
+            if len(args.runs) > 2:
+                parser.error("diff takes at most two runs")
+            new = _run_or_latest(db, args.runs[-1] if args.runs else None)
+            old = get_run(db, args.runs[0]) if len(args.runs) == 2 else previous_run(db, new)
+            if old is None:
+                raise SystemExit(f"ERROR: No earlier run of {new['source']} to compare with.")
+            print_diff(db, old, new, args.limit)
+    except BrokenPipeError:
+        # The reader (head, less, grep -m) quit early; stop quietly.
+        _stdout_closed()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,494 @@
 #!/usr/bin/env python3
 """
 Script to fix remaining Dart analysis issues
+
+Runs the analyzer once in machine format (`dart analyze --format=machine`)
+and keeps the parsed diagnostics in .oxbar/cache/dart-diagnostics.json.
+Every fixer reads that store instead of re-running and scraping
+`flutter analyze`, so a pass costs one analyze instead of one per fixer.
+
+All fixes are grouped by file and applied in one pass per file, bottom-up
+so earlier edits never shift later ones. Files are edited across a process
+pool and replaced atomically. The fixers are plugins registered with
+@fixer, e.g. with_opacity, which does fix_withOpacity.ps1's rewrite.
+Diagnostics whose fix was applied are then dropped from the store, so a
+--from-cache run never applies the same fix twice.
+
+--changed-since REV re-analyzes only the Dart files changed since a git
+revision (plus the files importing them) and merges the result with the
+stored diagnostics of every other file. The store records the commit it was
+written at and the files uncommitted then; everything changed since that
+commit, and those files, are re-analyzed too, so a checkout or commit
+between runs cannot leave stale diagnostics behind. A store from an unknown
+commit (or written outside git) means a full analyze.
+
+Usage:
+    python3 fix_issues.py [--project DIR] [--from-cache | --changed-since REV]
+                          [--fixer NAME ...] [--jobs N] [--list]
+
+    --project DIR   Flutter project root (default: this script's directory)
+    --from-cache    Use the stored diagnostics from the last run instead of
+                    running the analyzer
+    --changed-since REV
+                    Analyze only files changed since REV (e.g. origin/main)
+                    and their direct importers; the first run is a full one
+    --fixer NAME    Run only this fixer (repeatable; default: all)
+    --jobs N        Worker processes (default: one per CPU; 1 = no pool)
+    --list          List the registered fixers
 """
+import argparse
+import json
+import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+PROJECT_DIR = Path(__file__).resolve().parent
+CACHE_FILE = Path('.oxbar') / 'cache' / 'dart-diagnostics.json'
+ANALYZE_COMMAND = ['dart', 'analyze', '--format=machine']
+# Above this many files to re-analyze, --changed-since runs a full analyze
+# (no slower by then, and keeps the command line short enough for Windows).
+MAX_TARGETS = 200
+SKIP_DIRS = ('.dart_tool', 'build', '.oxbar')
+# dart analyze exits 0-3 for no issues / info / warning / error; anything
+# higher (usage error, missing pubspec, SDK crash) means it didn't analyze.
+ANALYZE_OK_CODES = range(4)
+
+
+class Diagnostic(NamedTuple):
+    severity: str   # ERROR, WARNING, INFO
+    type: str       # COMPILE_TIME_ERROR, STATIC_WARNING, LINT, ...
+    rule: str       # e.g. unused_field
+    file: str       # relative to the project, '/'-separated
+    line: int
+    col: int
+    length: int
+    message: str
 
-def get_issues():
-    """Get all analysis issues"""
-    result = subprocess.run(
-        ['flutter', 'analyze'],
-        cwd=r'C:\Users\alhas\StudioProjects\vagus_app',
-        capture_output=True,
-        text=True
-    )
-    return result.stderr
-
-def fix_unused_fields():
-    """Comment out unused fields"""
-    issues = get_issues()
 
-    # Find unused field issues
-    pattern = r"The value of the field '([^']+)' isn't used - ([^:]+):(\d+):\d+ - unused_field"
-    matches = re.findall(pattern, issues)
+# ── diagnostics store ─────────────────────────────────────────────────────────
 
-    print(f"Found {len(matches)} unused fields")
+def split_machine_line(line):
+    """Split SEVERITY|TYPE|CODE|FILE|LINE|COL|LENGTH|MESSAGE on unescaped '|'.
 
-    for field_name, file_path, line_num in matches:
-        if 'test' in file_path:
-            continue  # Skip test files for now
+    The analyzer escapes '\\' and '|' inside fields with a backslash.
+    """
+    fields, current, chars = [], [], iter(line)
+    for char in chars:
+        if char == '\\':
+            current.append(next(chars, ''))
+        elif char == '|':
+            fields.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append(''.join(current))
+    return fields
 
-        full_path = rf'C:\Users\alhas\StudioProjects\vagus_app\{file_path}'
-        print(f"Commenting out {field_name} in {file_path}:{line_num}")
 
+def parse_machine_output(output, project_dir):
+    """Diagnostics from machine-format analyzer output; other lines are skipped."""
+    diagnostics = []
+    for line in output.splitlines():
+        fields = split_machine_line(line.strip())
+        if len(fields) != 8 or not fields[4].isdigit():
+            continue
+        severity, kind, rule, file_path, line_num, col, length, message = fields
+        path = Path(file_path)
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            path = path.resolve().relative_to(project_dir)
+        except ValueError:
+            pass
+        diagnostics.append(Diagnostic(severity, kind, rule.lower(), path.as_posix(),
+                                      int(line_num), int(col), int(length), message))
+    return diagnostics
 
-            line_idx = int(line_num) - 1
-            if line_idx < len(lines):
-                # Comment out the line
-                lines[line_idx] = '  // ' + lines[line_idx].lstrip()
 
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-        except Exception as e:
-            print(f"  Error: {e}")
+class AnalyzerFailed(Exception):
+    """The analyzer ran but produced no usable result."""
 
-def fix_unnecessary_null_comparisons():
-    """Fix unnecessary null comparisons"""
-    issues = get_issues()
 
-    # Find unnecessary null comparison issues
-    pattern = r"The operand can't be 'null'.*- ([^:]+):(\d+):(\d+) - unnecessary_null_comparison"
-    matches = re.findall(pattern, issues)
+def run_analyzer(project_dir, files=None):
+    """Run the analyzer once over the project (or just files); return its diagnostics.
+
+    Raises AnalyzerFailed (with the analyzer's stderr) if it exited with an
+    error code or wrote to stderr without a single diagnostic line.
+    """
+    command = [shutil.which(ANALYZE_COMMAND[0]) or ANALYZE_COMMAND[0]] + ANALYZE_COMMAND[1:]
+    start = time.perf_counter()
+    result = subprocess.run(command + sorted(files or ()), cwd=project_dir,
+                            capture_output=True, text=True, encoding='utf-8',
+                            errors='replace')
+    # Machine output goes to stderr on older SDKs and stdout on newer ones.
+    diagnostics = parse_machine_output(result.stdout + '\n' + result.stderr, project_dir)
+    if (result.returncode not in ANALYZE_OK_CODES
+            or (result.stderr.strip() and not diagnostics)):
+        raise AnalyzerFailed(f"{' '.join(command)} exited with {result.returncode}:\n"
+                             f"{(result.stderr or result.stdout).strip()}")
+    if files:
+        diagnostics = [d for d in diagnostics if d.file in files]
+    target = f"{len(files)} files" if files else project_dir.name
+    print(f"Analyzed {target} in {time.perf_counter() - start:.1f}s: "
+          f"{len(diagnostics)} diagnostics")
+    return diagnostics
+
+
+def save_diagnostics(project_dir, diagnostics):
+    path = project_dir / CACHE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rev, dirty = git_state(project_dir)
+    store = {
+        'analyzed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'command': ANALYZE_COMMAND,
+        'rev': rev,       # HEAD when analyzed (None outside git)
+        'dirty': dirty,   # Dart files that differed from it
+        'diagnostics': [d._asdict() for d in diagnostics],
+    }
+    path.write_text(json.dumps(store, indent=1), encoding='utf-8')
+
+
+def read_store(project_dir):
+    return json.loads((project_dir / CACHE_FILE).read_text(encoding='utf-8'))
+
+
+def prune_diagnostics(project_dir, fixed):
+    """Drop the fixed diagnostics from the store, so --from-cache won't redo them."""
+    store = read_store(project_dir)
+    store['diagnostics'] = [d for d in store['diagnostics'] if Diagnostic(**d) not in fixed]
+    (project_dir / CACHE_FILE).write_text(json.dumps(store, indent=1), encoding='utf-8')
+
+
+def load_diagnostics(project_dir, store=None):
+    store = store or read_store(project_dir)
+    print(f"Using {len(store['diagnostics'])} diagnostics from {CACHE_FILE.as_posix()} "
+          f"(analyzed {store['analyzed_at']})")
+    return [Diagnostic(**d) for d in store['diagnostics']]
+
+
+def get_issues(project_dir, from_cache=False, changed_since=None):
+    """All diagnostics, from the store or from one fresh analyzer run.
+
+    With changed_since, only the files changed since that git revision or
+    since the store's own revision, and their direct importers, are
+    analyzed; the stored diagnostics are kept for every other file.
+    """
+    if from_cache:
+        return load_diagnostics(project_dir)
+    store = None
+    if changed_since and (project_dir / CACHE_FILE).exists():
+        store = read_store(project_dir)
+        if not store.get('rev') or not known_rev(project_dir, store['rev']):
+            print(f"Stored diagnostics are from an unknown revision "
+                  f"({store.get('rev') or 'none recorded'}); analyzing everything")
+            store = None
+    if store is not None:
+        changed = (changed_dart_files(project_dir, changed_since)
+                   | changed_dart_files(project_dir, store['rev'])
+                   | set(store.get('dirty', ())))
+        targets = changed | direct_importers(project_dir, changed)
+        if len(targets) <= MAX_TARGETS:
+            cached = load_diagnostics(project_dir, store)
+            existing = {file for file in targets if (project_dir / file).is_file()}
+            try:
+                fresh = run_analyzer(project_dir, existing) if existing else []
+            except AnalyzerFailed as e:
+                # e.g. an older SDK that takes only one target; the targets'
+                # cached diagnostics stay until a full run replaces them.
+                print(f"Analyzing the changed files failed ({e}); analyzing everything")
+            else:
+                kept = [d for d in cached if d.file not in targets]
+                print(f"Re-analyzed {len(changed)} changed and "
+                      f"{len(targets) - len(changed)} importing files since "
+                      f"{changed_since} and {store['rev'][:12]}; "
+                      f"kept {len(kept)} cached diagnostics")
+                diagnostics = sorted(kept + fresh, key=lambda d: (d.file, d.line, d.col))
+                save_diagnostics(project_dir, diagnostics)
+                return diagnostics
+        else:
+            print(f"{len(targets)} files changed since {changed_since}; "
+                  f"analyzing everything")
+    elif changed_since and not (project_dir / CACHE_FILE).exists():
+        print("No stored diagnostics yet; analyzing everything")
+    diagnostics = run_analyzer(project_dir)
+    save_diagnostics(project_dir, diagnostics)
+    return diagnostics
+
+
+# ── changed files ─────────────────────────────────────────────────────────────
+
+_DIRECTIVE = re.compile(r"""^\s*(?:import|export|part)\s+['"]([^'"]+)['"]""", re.MULTILINE)
+
+
+def _git(project_dir, *args):
+    result = subprocess.run(['git', *args], cwd=project_dir, capture_output=True,
+                            text=True, encoding='utf-8', check=True)
+    return result.stdout.splitlines()
+
+
+def git_state(project_dir):
+    """(HEAD, sorted uncommitted Dart files), or (None, []) outside a git work tree."""
+    try:
+        head = _git(project_dir, 'rev-parse', 'HEAD')[0]
+        return head, sorted(changed_dart_files(project_dir, head))
+    except (subprocess.CalledProcessError, FileNotFoundError, IndexError):
+        return None, []
+
+
+def known_rev(project_dir, rev):
+    try:
+        _git(project_dir, 'rev-parse', '--verify', '--quiet', rev + '^{commit}')
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+    return True
+
+
+def changed_dart_files(project_dir, rev):
+    """Dart files changed since rev: committed, staged, unstaged and untracked.
+
+    Deleted files are included, so that their stored diagnostics get dropped.
+    """
+    names = _git(project_dir, 'diff', '--name-only', '--relative', rev, '--')
+    names += _git(project_dir, 'ls-files', '--others', '--exclude-standard')
+    return {Path(name).as_posix() for name in names if name.endswith('.dart')}
+
 
-    print(f"\nFound {len(matches)} unnecessary null comparisons")
+def _package_name(project_dir):
+    pubspec = (project_dir / 'pubspec.yaml').read_text(encoding='utf-8')
+    match = re.search(r'^name:\s*(\S+)', pubspec, re.MULTILINE)
+    return match.group(1) if match else None
 
-    for file_path, line_num, col_num in matches:
-        if 'test' in file_path:
+
+def direct_importers(project_dir, files):
+    """Project files that import, export or part one of files."""
+    if not files:
+        return set()
+    package = f"package:{_package_name(project_dir)}/"
+    importers = set()
+    for path in project_dir.rglob('*.dart'):
+        relative = path.relative_to(project_dir)
+        if relative.parts[0] in SKIP_DIRS:
             continue
+        source = path.read_text(encoding='utf-8', errors='replace')
+        for uri in _DIRECTIVE.findall(source):
+            if uri.startswith(package):
+                target = 'lib/' + uri[len(package):]
+            elif ':' in uri:
+                continue  # dart: and other packages
+            else:
+                target = Path(os.path.normpath(relative.parent / uri)).as_posix()
+            if target in files:
+                importers.add(relative.as_posix())
+                break
+    return importers - files
 
-        full_path = rf'C:\Users\alhas\StudioProjects\vagus_app\{file_path}'
-        print(f"Fixing null comparison in {file_path}:{line_num}:{col_num}")
 
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Remove != null and ! operators for non-nullable types
-            # This is a simplistic fix - manual review recommended
-            lines = content.split('\n')
-            line_idx = int(line_num) - 1
-
-            if line_idx < len(lines):
-                line = lines[line_idx]
-                # Try to fix common patterns
-                line = re.sub(r'(\w+)\s*!=\s*null', r'\1', line)
-                line = re.sub(r'\.toSet\(\)\!', r'.toSet()', line)
-                line = re.sub(r'\.toList\(\)\!', r'.toList()', line)
-                lines[line_idx] = line
-
-            with open(full_path, 'w', encoding='utf-8', newline='\n') as f:
-                f.write('\n'.join(lines))
-        except Exception as e:
-            print(f"  Error: {e}")
+# ── fixers ────────────────────────────────────────────────────────────────────
+#
+# A fixer edits the lines of one file for one diagnostic of its rule and
+# returns whether it changed anything. Register it with @fixer; the engine
+# below runs every registered fixer in the same pass over each file.
+
+class Fixer(NamedTuple):
+    name: str
+    rule: str
+    edit: Callable      # (lines, diagnostic) -> bool; lines keep their endings
+    accepts: Callable   # (diagnostic) -> bool
+
+
+FIXERS = {}
+
+
+def _not_test(d):
+    return 'test' not in d.file  # Skip test files for now
+
+
+def fixer(rule, accepts=_not_test):
+    def register(edit):
+        FIXERS[edit.__name__] = Fixer(edit.__name__, rule, edit, accepts)
+        return edit
+    return register
+
+
+@fixer('unused_field')
+def unused_fields(lines, d):
+    """Comment out unused fields"""
+    if lines[d.line - 1].lstrip().startswith('//'):
+        return False  # already commented out
+    lines[d.line - 1] = '  // ' + lines[d.line - 1].lstrip()
+    return True
+
+
+@fixer('unnecessary_null_comparison')
+def null_comparisons(lines, d):
+    """Fix unnecessary null comparisons"""
+    # Remove != null and ! operators for non-nullable types
+    # This is a simplistic fix - manual review recommended
+    # Only the diagnostic's own span is edited, so fixes further left on
+    # the line keep their columns.
+    line = lines[d.line - 1]
+    start, end = d.col - 1, d.col - 1 + d.length
+    span = line[start:end]
+    span = re.sub(r'(\w+)\s*!=\s*null', r'\1', span)
+    span = re.sub(r'^\s*!=\s*null', '', span)  # span is just the `!= null`
+    span = re.sub(r'\.toSet\(\)\!', r'.toSet()', span)
+    span = re.sub(r'\.toList\(\)\!', r'.toList()', span)
+    if span == line[start:end]:
+        return False
+    prefix = line[:start].rstrip(' ') if not span else line[:start]
+    lines[d.line - 1] = prefix + span + line[end:]
+    return True
+
+
+def _with_opacity(d):
+    return (d.message.startswith("'withOpacity' is deprecated")
+            and d.file.startswith('lib/') and '/generated/' not in d.file)
+
+
+@fixer('deprecated_member_use', accepts=_with_opacity)
+def with_opacity(lines, d):
+    """.withOpacity(x) -> .withValues(alpha: x), as fix_withOpacity.ps1"""
+    line = lines[d.line - 1]
+    call = re.compile(r'withOpacity\(').match(line, d.col - 1)
+    if not call:
+        return False
+    lines[d.line - 1] = line[:call.start()] + 'withValues(alpha: ' + line[call.end():]
+    return True
+
+
+# ── edit engine ───────────────────────────────────────────────────────────────
+
+class FileResult(NamedTuple):
+    file: str
+    edits: dict     # fixer name -> edits applied
+    fixed: list     # diagnostics whose edit was applied
+    skipped: dict   # fixer name -> diagnostics that needed no change
+    seconds: dict   # fixer name -> time spent editing
+    error: str
+
+
+def plan(diagnostics, fixers):
+    """Group the diagnostics the fixers handle by file: {file: [(fixer, d)]}."""
+    by_rule = {}
+    for f in fixers:
+        by_rule.setdefault(f.rule, []).append(f)
+    pending = {}
+    for d in diagnostics:
+        for f in by_rule.get(d.rule, ()):
+            if f.accepts(d):
+                pending.setdefault(d.file, []).append((f.name, d))
+    return pending
+
+
+def fix_file(project_dir, file, items):
+    """Apply every pending fix to one file in a single read and atomic write.
+
+    Fixes are applied bottom-up (last line and column first), so an edit
+    never moves the positions of the diagnostics still to be applied.
+    """
+    edits, skipped, seconds, fixed = {}, {}, {}, []
+    path = project_dir / file
+    try:
+        # newline='' splits at \n, \r\n and \r only, as the analyzer counts
+        # lines (str.splitlines() also breaks at U+2028, \x0c, ...).
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            lines = f.readlines()
+        for name, d in sorted(items, key=lambda item: (item[1].line, item[1].col),
+                              reverse=True):
+            start = time.perf_counter()
+            changed = d.line <= len(lines) and FIXERS[name].edit(lines, d)
+            seconds[name] = seconds.get(name, 0.0) + time.perf_counter() - start
+            counts = edits if changed else skipped
+            counts[name] = counts.get(name, 0) + 1
+            if changed:
+                fixed.append(d)
+        if edits:
+            fd, tmp = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=path.parent)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                    f.writelines(lines)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+    except Exception as e:
+        return FileResult(file, {}, [], {}, seconds, str(e))
+    return FileResult(file, edits, fixed, skipped, seconds, None)
+
+
+def apply_fixes(project_dir, pending, jobs=None):
+    """Fix every file in pending, across a process pool when jobs != 1."""
+    if jobs == 1 or len(pending) < 2:
+        return [fix_file(project_dir, file, items) for file, items in pending.items()]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(fix_file, project_dir, file, items)
+                   for file, items in pending.items()]
+        return [future.result() for future in futures]
+
+
+def print_report(fixers, pending, results, elapsed):
+    wanted = {}
+    for items in pending.values():
+        for name, _ in items:
+            wanted[name] = wanted.get(name, 0) + 1
+    print(f"\n{'fixer':<18} {'diagnostics':>11} {'edits':>6} {'unchanged':>9} "
+          f"{'files':>6} {'ms':>8}")
+    for f in fixers:
+        edits = sum(r.edits.get(f.name, 0) for r in results)
+        skipped = sum(r.skipped.get(f.name, 0) for r in results)
+        files = sum(1 for r in results if r.edits.get(f.name))
+        ms = sum(r.seconds.get(f.name, 0.0) for r in results) * 1000
+        print(f"{f.name:<18} {wanted.get(f.name, 0):>11} {edits:>6} {skipped:>9} "
+              f"{files:>6} {ms:>8.1f}")
+    for r in results:
+        if r.error:
+            print(f"  Error in {r.file}: {r.error}")
+    written = sum(1 for r in results if r.edits)
+    print(f"\nRewrote {written} of {len(pending)} files in {elapsed:.2f}s")
+
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fix remaining Dart analysis issues')
+    parser.add_argument('--project', type=Path, default=PROJECT_DIR)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--from-cache', action='store_true')
+    source.add_argument('--changed-since', metavar='REV', default=None)
+    parser.add_argument('--fixer', action='append', dest='fixers', choices=sorted(FIXERS))
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args()
+    project_dir = args.project.resolve()
+
+    if args.list:
+        for f in FIXERS.values():
+            print(f"{f.name:<18} {f.rule:<28} {(f.edit.__doc__ or '').strip()}")
+        sys.exit(0)
+
     print("Fixing Dart analysis issues...")
-    fix_unused_fields()
-    fix_unnecessary_null_comparisons()
+    try:
+        diagnostics = get_issues(project_dir, args.from_cache, args.changed_since)
+    except subprocess.CalledProcessError as e:
+        print(f"ERROR: git failed: {e.stderr.strip()}")
+        sys.exit(1)
+    except AnalyzerFailed as e:
+        print(f"ERROR: {e}\nStored diagnostics left unchanged")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e.filename} not found "
+              f"({'run once without --from-cache' if args.from_cache else 'is the Dart SDK on PATH?'})")
+        sys.exit(1)
+
+    fixers = [FIXERS[name] for name in args.fixers or FIXERS]
+    start = time.perf_counter()
+    pending = plan(diagnostics, fixers)
+    results = apply_fixes(project_dir, pending, args.jobs)
+    print_report(fixers, pending, results, time.perf_counter() - start)
+    fixed = {d for r in results for d in r.fixed}
+    if fixed:
+        prune_diagnostics(project_dir, fixed)
     print("\nDone! Run 'flutter analyze' to see remaining issues.")
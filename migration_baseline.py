@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Consolidated schema baseline for the supabase/migrations/ chain
+
+Bootstrapping an empty database replays every migration, which gets slower
+with every sprint. `create` applies the chain to a scratch database (see
+migration_harness.py) and dumps the resulting schema with pg_dump into
+supabase/migrations/_baseline/schema.sql, followed by a data-only dump of
+every table the migrations wrote rows to (seeds such as billing_plans and
+notification_templates). The file's header lists every migration it covers
+with its checksum:
+
+    -- baseline-of: 20260428260000_user_devices_fcm.sql 3f9a...
+    -- covers: 20260427211500_vault_audit_table.sql 8c1e...
+    -- replays: 20260428250001_dangerzone_cron.sql
+
+Some writes cannot be snapshotted: pg_cron jobs live in the cron schema,
+which is not dumped, and are registered from the target's own settings.
+Migrations that call cron.schedule() (or carry a "-- baseline: replay"
+comment line) are therefore still covered, but their SQL is embedded after
+the dump and re-run when the baseline is applied; they must be idempotent.
+
+apply_migration.py applies the baseline on empty databases and records the
+covered migrations as applied, then replays only newer migrations. If a
+covered file changes, the baseline is stale and ignored until re-created.
+
+`verify` builds the schema both ways — full replay, and baseline plus the
+newer migrations through apply_migration.py's own code — and compares the
+two catalogs (tables, columns, constraints, indexes, views, functions,
+triggers, policies, types, grants; see migration_catalog.py) and the rows
+of every non-empty table.
+
+Supabase's own schemas (auth, extensions, vault) and the migration ledger
+are left out of the dump. The chain builds on the production schema that
+predates it, so pass that with --base as for migration_harness.py.
+
+Usage:
+    python3 migration_baseline.py [--admin-url URL] [--dir DIR] [--base FILE]
+                                  [--pg-dump PATH] COMMAND
+
+    create [--upto FILE]  Write the baseline for the chain up to and including
+                          FILE (default: the latest migration)
+    verify                Compare baseline + newer migrations with a full replay
+
+    --pg-dump PATH  pg_dump binary, at least the server's version
+                    (default: $PG_DUMP, then pg_dump on PATH)
+
+Exit codes:
+    0 — baseline written / catalogs match
+    1 — a migration failed, pg_dump failed, or the catalogs or rows differ
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+import migration_catalog
+from apply_migration import (
+    LEDGER_SCHEMA,
+    SUPABASE_HISTORY_SCHEMA,
+    apply_pending,
+    baseline_delta,
+    load_baseline,
+    read_ledger,
+)
+from migration_harness import STUB_SCHEMAS, Harness, MigrationFailed
+from migration_sql import BASELINE_NAME, MIGRATIONS_DIR, replays_on_baseline
+
+# pg_dump output lines that must not end up in the baseline: psql-only
+# \restrict guards (pg_dump 17.6+), and comments on extensions, which only
+# their owner (not the Supabase postgres role) may set.
+_DUMP_NOISE = re.compile(r"^(?:\\(?:un)?restrict\b.*|COMMENT ON EXTENSION .*)\n",
+                         re.MULTILINE)
+
+# Rows in these schemas are not seed data: the stubs are Supabase's, and
+# applying the baseline writes both migration histories itself.
+DATA_EXCLUDE = STUB_SCHEMAS + (LEDGER_SCHEMA, SUPABASE_HISTORY_SCHEMA)
+
+
+def dump_schema(url, pg_dump=None):
+    """Schema-only pg_dump of url, without Supabase's schemas or the ledger."""
+    command = [pg_dump or os.environ.get("PG_DUMP") or "pg_dump",
+               "--schema-only", "--no-owner", "--dbname", url]
+    for schema in STUB_SCHEMAS + (LEDGER_SCHEMA,):
+        command.append(f"--exclude-schema={schema}")
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return _DUMP_NOISE.sub("", result.stdout)
+
+
+def dump_data(url, tables, pg_dump=None):
+    """Data-only pg_dump of tables [(schema, table)], as INSERTs (no COPY, so
+    apply_migration.py can run it through psycopg2)."""
+    command = [pg_dump or os.environ.get("PG_DUMP") or "pg_dump",
+               "--data-only", "--column-inserts", "--no-owner", "--dbname", url]
+    for schema, table in tables:
+        command.append(f'--table="{schema}"."{table}"')
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return _DUMP_NOISE.sub("", result.stdout)
+
+
+def seeded_tables(url):
+    """[(schema, table)] of every table with rows, outside DATA_EXCLUDE."""
+    conn = psycopg2.connect(url, application_name="migration_baseline")
+    try:
+        return sorted(migration_catalog.rows(conn, DATA_EXCLUDE))
+    finally:
+        conn.close()
+
+
+def render(migrations, schema_sql, data_sql="", replays=()):
+    latest = migrations[-1]
+    header = [
+        "-- Baseline of supabase/migrations/ — generated by",
+        "-- `python3 migration_baseline.py create`; do not edit by hand.",
+        f"-- baseline-of: {latest.filename} {latest.checksum}",
+    ]
+    header += [f"-- covers: {m.filename} {m.checksum}" for m in migrations]
+    header += [f"-- replays: {m.filename}" for m in replays]
+    parts = ["\n".join(header) + "\n\n" + schema_sql]
+    if data_sql:
+        parts.append("--\n-- Rows written by the covered migrations\n--\n\n" + data_sql)
+    for m in replays:
+        # The dumps empty search_path; replayed files run as they would alone.
+        parts.append(f"--\n-- Replayed: {m.filename}\n--\n\nRESET ALL;\n\n{m.sql}")
+    return "\n".join(parts)
+
+
+def create(harness, directory, upto=None, pg_dump=None):
+    """Write the baseline covering the chain up to upto; return its path."""
+    migrations = harness.migrations
+    if upto:
+        names = [m.filename for m in migrations]
+        if Path(upto).name not in names:
+            raise SystemExit(f"ERROR: {upto} is not a migration in {directory}")
+        migrations = migrations[:names.index(Path(upto).name) + 1]
+    if not migrations:
+        raise SystemExit(f"ERROR: No migrations in {directory}")
+
+    with harness.scratch(migrations, harness.base_sql) as url:
+        schema_sql = dump_schema(url, pg_dump)
+        tables = seeded_tables(url)
+        data_sql = dump_data(url, tables, pg_dump) if tables else ""
+    replays = [m for m in migrations if replays_on_baseline(m.sql)]
+    for schema, table in tables:
+        print(f"  data: {schema}.{table}")
+    for m in replays:
+        print(f"  replays: {m.filename}")
+    path = Path(directory) / BASELINE_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render(migrations, schema_sql, data_sql, replays), encoding="utf-8")
+    return path, migrations
+
+
+def _catalog(url):
+    """(schema snapshot, table rows) of the database at url."""
+    conn = psycopg2.connect(url, application_name="migration_baseline")
+    try:
+        return (migration_catalog.snapshot(conn, STUB_SCHEMAS + (LEDGER_SCHEMA,)),
+                migration_catalog.rows(conn, DATA_EXCLUDE))
+    finally:
+        conn.close()
+
+
+def verify(harness, directory):
+    """Return (differences, replay seconds, baseline seconds, ledger problems)."""
+    baseline = load_baseline(directory)
+    if baseline is None:
+        raise SystemExit(f"ERROR: No baseline at {Path(directory) / BASELINE_NAME}; "
+                         f"run `python3 migration_baseline.py create` first.")
+    delta = baseline_delta(baseline, harness.migrations)
+    if delta is None:
+        raise SystemExit(f"ERROR: {baseline.path} is stale (the migrations it covers "
+                         f"changed); re-create it.")
+
+    print(f"Full replay ({len(harness.migrations)} migrations)...")
+    start = time.perf_counter()
+    with harness.scratch(harness.migrations, harness.base_sql) as url:
+        replay_time = time.perf_counter() - start
+        expected, expected_rows = _catalog(url)
+
+    print(f"\nBaseline ({len(baseline.covers)} migrations) + {len(delta)} newer...")
+    start = time.perf_counter()
+    with harness.scratch() as url:
+        conn = psycopg2.connect(url, application_name="migration_baseline")
+        try:
+            apply_pending(conn, delta, baseline=baseline,
+                          migrations=harness.migrations)
+            ledger = read_ledger(conn)
+        finally:
+            conn.close()
+        baseline_time = time.perf_counter() - start
+        actual, actual_rows = _catalog(url)
+
+    wanted = {m.filename: m.checksum for m in harness.migrations}
+    ledger_problems = sorted(set(wanted.items()) ^ set(ledger.items()))
+    differences = (migration_catalog.diff(expected, actual)
+                   + migration_catalog.diff_rows(expected_rows, actual_rows))
+    return differences, replay_time, baseline_time, ledger_problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create or verify the schema baseline")
+    parser.add_argument("--admin-url", default=None)
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR)
+    parser.add_argument("--base", type=Path, default=None,
+                        help="Schema the chain builds on (e.g. a schema-only dump)")
+    parser.add_argument("--pg-dump", default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+    create_parser = commands.add_parser("create")
+    create_parser.add_argument("--upto", default=None)
+    commands.add_parser("verify")
+    args = parser.parse_args(argv)
+
+    try:
+        harness = Harness(args.admin_url, args.dir, args.base)
+        if args.command == "create":
+            start = time.perf_counter()
+            path, covered = create(harness, args.dir, args.upto, args.pg_dump)
+            print(f"\nWrote {path} ({path.stat().st_size // 1024} KiB) covering "
+                  f"{len(covered)} migrations up to {covered[-1].filename} "
+                  f"in {time.perf_counter() - start:.2f}s")
+            return
+
+        differences, replay_time, baseline_time, ledger_problems = verify(harness, args.dir)
+        print("\n" + "="*80)
+        print(f"Full replay {replay_time:.2f}s, baseline + newer {baseline_time:.2f}s")
+        if ledger_problems:
+            print("Ledger after baseline + newer does not list exactly the chain:")
+            for filename, checksum in ledger_problems:
+                print(f"  {filename} {checksum[:12]}")
+        if differences:
+            print(f"FAILED: {len(differences)} catalog/row difference(s) "
+                  f"(expected = full replay, actual = baseline + newer):")
+            migration_catalog.print_differences(differences)
+        else:
+            print("Catalogs and rows match.")
+        print("="*80)
+        sys.exit(1 if differences or ledger_problems else 0)
+    except MigrationFailed as e:
+        print(f"\nERROR: Migration failed:")
+        print(f"  {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        print(f"\nERROR: {e.filename} not found; pass --pg-dump or set $PG_DUMP.")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: pg_dump failed:")
+        print(f"  {e.stderr.strip()}")
+        sys.exit(1)
+    except psycopg2.Error as e:
+        print(f"\nERROR: Database error occurred:")
+        print(f"  {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Catalog snapshots for comparing database schemas
+
+snapshot() reads a database's schema in one round trip (one bulk
+pg_catalog query per object kind, combined into a single statement) and
+returns {kind: {key: details}}, e.g.
+
+    "columns": {("public", "profiles", "full_name"): ("text", False, None, ...)}
+
+Keys identify an object (schema, table, name); details hold everything a
+migration could change about it (type, default, definition, ACL), in the
+order of FIELDS[kind]. Two snapshots are equal exactly when the schemas
+are, and diff() lists the objects missing from, extra in, or changed in
+the second one.
+
+Only user schemas are read: pg_catalog, information_schema, pg_toast and
+the schemas passed as exclude are skipped; include limits it further.
+
+stamp() is a cheap fingerprint of the catalogs snapshot() reads: it
+changes whenever DDL or GRANTs touch them, so a saved snapshot can be
+reused while the stamp is unchanged (see save()/load()).
+
+rows() reads the contents of every non-empty user table (seed data written
+by migrations), and diff_rows() compares two such reads.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import NamedTuple
+
+SYSTEM_SCHEMAS = ("pg_catalog", "information_schema", "pg_toast")
+
+_USER_NAMESPACE = """
+    n.nspname <> ALL(%(exclude)s) AND n.nspname NOT LIKE 'pg\\_%%'
+    AND (%(include)s::text[] IS NULL OR n.nspname = ANY(%(include)s::text[]))
+"""
+# Objects created by CREATE EXTENSION belong to the extension, not the schema.
+_NOT_EXTENSION_MEMBER = """
+    NOT EXISTS (SELECT 1 FROM pg_depend d
+                WHERE d.objid = {oid} AND d.deptype = 'e')
+"""
+
+# kind -> (key fields, detail fields, query returning both, in that order).
+# Column aliases must be unique within a query: rows travel as JSON objects.
+QUERIES = {
+    "schemas": (("schema",), ("nspacl",), f"""
+        SELECT n.nspname AS schema, n.nspacl::text AS nspacl
+        FROM pg_namespace n
+        WHERE {_USER_NAMESPACE}
+    """),
+    "extensions": (("extension",), ("version", "schema"), """
+        SELECT e.extname AS extension, e.extversion AS version, n.nspname AS schema
+        FROM pg_extension e JOIN pg_namespace n ON n.oid = e.extnamespace
+        WHERE e.extname <> 'plpgsql'
+    """),
+    "tables": (("schema", "table"), ("kind", "rls", "force_rls", "relacl"), f"""
+        SELECT n.nspname AS schema, c.relname AS table, c.relkind::text AS kind,
+               c.relrowsecurity AS rls, c.relforcerowsecurity AS force_rls,
+               c.relacl::text AS relacl
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+          AND {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="c.oid")}
+    """),
+    "columns": (("schema", "table", "column"),
+                ("type", "not_null", "default", "identity", "generated", "attacl"), f"""
+        SELECT n.nspname AS schema, c.relname AS table, a.attname AS column,
+               format_type(a.atttypid, a.atttypmod) AS type, a.attnotnull AS not_null,
+               pg_get_expr(ad.adbin, ad.adrelid) AS default,
+               a.attidentity::text AS identity, a.attgenerated::text AS generated,
+               a.attacl::text AS attacl
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+        WHERE a.attnum > 0 AND NOT a.attisdropped
+          AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+          AND {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="c.oid")}
+    """),
+    "constraints": (("schema", "table", "constraint"), ("type", "definition"), f"""
+        SELECT n.nspname AS schema, c.relname AS table, con.conname AS constraint,
+               con.contype::text AS type, pg_get_constraintdef(con.oid) AS definition
+        FROM pg_constraint con
+        JOIN pg_class c ON c.oid = con.conrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {_USER_NAMESPACE}
+    """),
+    "indexes": (("schema", "table", "index"), ("definition",), f"""
+        SELECT n.nspname AS schema, t.relname AS table, i.relname AS index,
+               pg_get_indexdef(i.oid) AS definition
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = i.relnamespace
+        WHERE {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="t.oid")}
+    """),
+    "views": (("schema", "view"), ("definition",), f"""
+        SELECT n.nspname AS schema, c.relname AS view, pg_get_viewdef(c.oid) AS definition
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('v', 'm')
+          AND {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="c.oid")}
+    """),
+    "sequences": (("schema", "sequence"),
+                  ("type", "start", "increment", "min", "max", "cache", "cycle"), f"""
+        SELECT n.nspname AS schema, c.relname AS sequence,
+               format_type(s.seqtypid, NULL) AS type, s.seqstart AS start,
+               s.seqincrement AS increment, s.seqmin AS min, s.seqmax AS max,
+               s.seqcache AS cache, s.seqcycle AS cycle
+        FROM pg_sequence s
+        JOIN pg_class c ON c.oid = s.seqrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="c.oid")}
+    """),
+    "functions": (("schema", "function", "arguments"), ("definition_md5", "proacl"), f"""
+        SELECT n.nspname AS schema, p.proname AS function,
+               pg_get_function_identity_arguments(p.oid) AS arguments,
+               CASE WHEN p.prokind = 'a' THEN NULL
+                    ELSE md5(pg_get_functiondef(p.oid)) END AS definition_md5,
+               p.proacl::text AS proacl
+        FROM pg_proc p JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="p.oid")}
+    """),
+    "triggers": (("schema", "table", "trigger"), ("definition",), f"""
+        SELECT n.nspname AS schema, c.relname AS table, t.tgname AS trigger,
+               pg_get_triggerdef(t.oid) AS definition
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT t.tgisinternal AND {_USER_NAMESPACE}
+    """),
+    "policies": (("schema", "table", "policy"),
+                 ("permissive", "command", "roles", "using", "with_check"), f"""
+        SELECT n.nspname AS schema, c.relname AS table, p.polname AS policy,
+               p.polpermissive AS permissive, p.polcmd::text AS command,
+               (SELECT array_agg(role ORDER BY role)
+                FROM (SELECT CASE WHEN r = 0 THEN 'public'
+                                  ELSE pg_get_userbyid(r)::text END AS role
+                      FROM unnest(p.polroles) r) pr)::text AS roles,
+               pg_get_expr(p.polqual, p.polrelid) AS using,
+               pg_get_expr(p.polwithcheck, p.polrelid) AS with_check
+        FROM pg_policy p
+        JOIN pg_class c ON c.oid = p.polrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {_USER_NAMESPACE}
+    """),
+    "types": (("schema", "type"), ("kind", "labels", "base_type"), f"""
+        SELECT n.nspname AS schema, t.typname AS type, t.typtype::text AS kind,
+               (SELECT string_agg(e.enumlabel, ',' ORDER BY e.enumsortorder)
+                FROM pg_enum e WHERE e.enumtypid = t.oid) AS labels,
+               CASE WHEN t.typtype = 'd'
+                    THEN format_type(t.typbasetype, t.typtypmod) END AS base_type
+        FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE t.typtype IN ('e', 'd')
+          AND {_USER_NAMESPACE}
+          AND {_NOT_EXTENSION_MEMBER.format(oid="t.oid")}
+    """),
+}
+
+FIELDS = {kind: keys + details for kind, (keys, details, _) in QUERIES.items()}
+
+_SNAPSHOT = "SELECT json_build_object({})".format(", ".join(
+    f"'{kind}', (SELECT coalesce(json_agg(q), '[]') FROM ({query}) q)"
+    for kind, (_, _, query) in QUERIES.items()))
+# Saved snapshots are only reused if they were read with these queries.
+_SNAPSHOT_DIGEST = hashlib.sha256(_SNAPSHOT.encode()).hexdigest()[:16]
+
+# Catalogs snapshot() reads. Any DDL or GRANT writes a row version into one
+# of them; the xmin sum changes with it (freezing keeps xmin since 9.4).
+_STAMP_CATALOGS = ("pg_namespace", "pg_class", "pg_attribute", "pg_attrdef",
+                   "pg_constraint", "pg_index", "pg_proc", "pg_trigger", "pg_policy",
+                   "pg_type", "pg_enum", "pg_extension", "pg_sequence")
+_STAMP = "SELECT md5(concat_ws(',', {}))".format(", ".join(
+    f"(SELECT count(*) || ':' || coalesce(sum(xmin::text::bigint), 0) FROM {catalog})"
+    for catalog in _STAMP_CATALOGS))
+
+
+class Difference(NamedTuple):
+    kind: str
+    key: tuple
+    change: str         # "missing", "extra" or "changed"
+    expected: tuple     # details in the first snapshot (None if extra)
+    actual: tuple       # details in the second snapshot (None if missing)
+
+
+def snapshot(conn, exclude=(), include=None):
+    """Return {kind: {key: details}} for every user schema not in exclude
+    (and in include, if given)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_SNAPSHOT, {"exclude": list(SYSTEM_SCHEMAS) + list(exclude),
+                                   "include": list(include) if include is not None else None})
+        rows_by_kind = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    result = {}
+    for kind, (keys, _, _) in QUERIES.items():
+        result[kind] = {}
+        for row in rows_by_kind[kind]:
+            values = tuple(row.values())
+            result[kind][values[:len(keys)]] = values[len(keys):]
+    return result
+
+
+def stamp(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_STAMP)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def only(catalog, kinds=None, schemas=None, ignore_fields=()):
+    """catalog restricted to kinds and schemas, without the ignore_fields details."""
+    result = {}
+    for kind, objects in catalog.items():
+        if kinds is not None and kind not in kinds:
+            continue
+        keys, details, _ = QUERIES[kind]
+        keep = [i for i, field in enumerate(details) if field not in ignore_fields]
+        scoped = schemas is not None and keys[0] == "schema"
+        result[kind] = {key: tuple(values[i] for i in keep)
+                        for key, values in objects.items()
+                        if not scoped or key[0] in schemas}
+    return result
+
+
+def diff(expected, actual):
+    """Differences turning snapshot expected into actual, in kind/key order."""
+    differences = []
+    for kind in QUERIES:
+        a, b = expected.get(kind, {}), actual.get(kind, {})
+        for key in sorted(a.keys() | b.keys(), key=lambda k: tuple(map(str, k))):
+            if key not in b:
+                differences.append(Difference(kind, key, "missing", a[key], None))
+            elif key not in a:
+                differences.append(Difference(kind, key, "extra", None, b[key]))
+            elif a[key] != b[key]:
+                differences.append(Difference(kind, key, "changed", a[key], b[key]))
+    return differences
+
+
+def print_differences(differences, expected_label="expected", actual_label="actual"):
+    for d in differences:
+        name = ".".join(str(part) for part in d.key)
+        print(f"  {d.change:8} {d.kind:12} {name}")
+        if d.change == "changed":
+            for label, details in ((expected_label, d.expected), (actual_label, d.actual)):
+                print(f"             {label}: {details}")
+
+
+def counts(catalog):
+    return {kind: len(objects) for kind, objects in catalog.items()}
+
+
+# ── table contents ────────────────────────────────────────────────────────────
+
+# Column defaults that yield a new value on every insert (now(),
+# gen_random_uuid(), CURRENT_TIMESTAMP, ...), so two builds of the same seed
+# data differ in them; such columns are not compared. nextval() is kept: a
+# fresh database numbers the same inserts the same way.
+_VOLATILE_DEFAULT = re.compile(r"\b(?!nextval\()\w+\(|\bCURRENT_\w+|\bLOCALTIME\w*",
+                               re.IGNORECASE)
+
+_TABLE_COLUMNS = f"""
+    SELECT n.nspname, c.relname, a.attname, pg_get_expr(d.adbin, d.adrelid)
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+    WHERE c.relkind IN ('r', 'p') AND NOT c.relispartition
+      AND {_USER_NAMESPACE}
+      AND {_NOT_EXTENSION_MEMBER.format(oid="c.oid")}
+    ORDER BY 1, 2, a.attnum
+"""
+
+
+def _ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+def rows(conn, exclude=(), include=None):
+    """Return {(schema, table): sorted rows as JSON text} for every non-empty
+    user table not in exclude (and in include, if given).
+
+    All tables are read in one statement. Columns with a volatile default
+    are left out of the rows.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_TABLE_COLUMNS, {"exclude": list(SYSTEM_SCHEMAS) + list(exclude),
+                                        "include": list(include) if include is not None
+                                        else None})
+        columns = {}
+        for schema, table, column, default in cursor.fetchall():
+            kept = columns.setdefault((schema, table), [])
+            if not (default and _VOLATILE_DEFAULT.search(default)):
+                kept.append(column)
+        if not columns:
+            return {}
+        cursor.execute(" UNION ALL ".join(
+            f"SELECT {_literal(schema)}, {_literal(table)}, row_to_json(t)::text FROM "
+            f"(SELECT {', '.join(map(_ident, kept))} FROM {_ident(schema)}.{_ident(table)}) t"
+            for (schema, table), kept in columns.items()))
+        result = {}
+        for schema, table, row in cursor.fetchall():
+            result.setdefault((schema, table), []).append(row)
+    finally:
+        cursor.close()
+    return {key: tuple(sorted(values)) for key, values in result.items()}
+
+
+def diff_rows(expected, actual):
+    """Tables whose rows differ between two rows() reads, as Differences.
+
+    A changed table's details are the rows only in expected and only in actual.
+    """
+    differences = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if key not in actual:
+            differences.append(Difference("rows", key, "missing", expected[key], None))
+        elif key not in expected:
+            differences.append(Difference("rows", key, "extra", None, actual[key]))
+        elif expected[key] != actual[key]:
+            a, b = Counter(expected[key]), Counter(actual[key])
+            differences.append(Difference("rows", key, "changed",
+                                          tuple((a - b).elements()), tuple((b - a).elements())))
+    return differences
+
+
+# ── persistence ───────────────────────────────────────────────────────────────
+
+def save(path, catalog, **meta):
+    """Write catalog (and meta, e.g. its stamp) to path as JSON."""
+    data = dict(meta, queries=_SNAPSHOT_DIGEST,
+                catalog={kind: [[list(key), list(details)]
+                                for key, details in objects.items()]
+                         for kind, objects in catalog.items()})
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load(path):
+    """Return (catalog, meta) saved by save(), or (None, {}) if unreadable.
+
+    Snapshots saved with different QUERIES count as unreadable.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, {}
+    if data.get("queries") != _SNAPSHOT_DIGEST:
+        return None, {}
+    catalog = {kind: {tuple(key): tuple(details) for key, details in objects}
+               for kind, objects in data.pop("catalog").items()}
+    return catalog, data
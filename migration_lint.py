@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Static performance lint for Supabase migrations
+
+Reads the migration chain (supabase/migrations/_archive/ first for context,
+then the top-level files) and reports the classic Supabase hot-path
+mistakes with file:line locations:
+
+  auth-per-row             auth.uid() / auth.jwt() / auth.role() /
+                           current_setting() called directly in an RLS
+                           policy. Postgres evaluates it once per row;
+                           (select auth.uid()) is evaluated once per query.
+  unindexed-fk             A foreign key whose columns are not the leading
+                           columns of any index on the referencing table, so
+                           deletes on the referenced table and joins scan it.
+  unindexed-policy-column  A policy compares a column with auth.uid(), but
+                           no index on the table starts with that column.
+
+Indexes and foreign keys are evaluated against the schema at the end of the
+chain, so an index added by a later migration covers an earlier FK. Tables
+the chain never creates are not judged.
+
+Findings already present when the baseline was written (lint-baseline.json
+next to the migrations) are reported as "baselined" and do not fail the run;
+applied migrations cannot be edited, so they are fixed in new migrations.
+A trailing "-- lint: ignore <rule>" comment on the reported line (or the
+line above it) silences one finding.
+
+apply_migration.py runs this as a gate on pending migrations.
+
+Usage:
+    python3 migration_lint.py [--dir DIR] [--no-archive] [--baseline PATH]
+                              [--write-baseline] [--json PATH] [FILE ...]
+
+    FILE ...          Report only these files (default: all top-level files);
+                      each must be a migration of the chain read from --dir
+    --no-archive      Do not read _archive/ for schema context
+    --write-baseline  Accept all current findings into the baseline (with
+                      FILE arguments, only those files' entries are replaced)
+
+Exit codes:
+    0 — no findings beyond the baseline
+    1 — new findings
+    2 — a FILE does not exist or is not part of the chain
+"""
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from typing import NamedTuple
+
+from migration_sql import (
+    MIGRATIONS_DIR,
+    mask_sql,
+    migration_paths,
+    split_statements,
+)
+
+BASELINE_NAME = "lint-baseline.json"
+RULES = ("auth-per-row", "unindexed-fk", "unindexed-policy-column")
+
+_FLAGS = re.IGNORECASE | re.DOTALL
+IDENT = r'(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)'
+QNAME = rf"{IDENT}(?:\s*\.\s*{IDENT})?"
+
+CREATE_TABLE = re.compile(
+    rf"^CREATE\s+(?:(?:UNLOGGED|TEMP|TEMPORARY)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?({QNAME})\s*\(",
+    _FLAGS)
+ALTER_TABLE = re.compile(
+    rf"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?({QNAME})\s+", _FLAGS)
+CREATE_INDEX = re.compile(
+    rf"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?:(?!ON\b)({IDENT})\s+)?ON\s+(?:ONLY\s+)?({QNAME})\s*(?:USING\s+\w+\s*)?\(",
+    _FLAGS)
+DROP_INDEX = re.compile(
+    r"^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(.+?)(?:\s+(?:CASCADE|RESTRICT))?$",
+    _FLAGS)
+DROP_TABLE = re.compile(
+    r"^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(.+?)(?:\s+(?:CASCADE|RESTRICT))?$", _FLAGS)
+POLICY = re.compile(rf"^(?:CREATE|ALTER)\s+POLICY\s+({IDENT})\s+ON\s+({QNAME})", _FLAGS)
+DROP_POLICY = re.compile(
+    rf"^DROP\s+POLICY\s+(?:IF\s+EXISTS\s+)?({IDENT})\s+ON\s+({QNAME})", _FLAGS)
+
+COLUMN_PK = re.compile(r"\bPRIMARY\s+KEY\b", _FLAGS)
+COLUMN_UNIQUE = re.compile(r"\bUNIQUE\b", _FLAGS)
+REFERENCES = re.compile(rf"\bREFERENCES\s+({QNAME})", _FLAGS)
+TABLE_CONSTRAINT = re.compile(
+    rf"^(?:CONSTRAINT\s+{IDENT}\s+)?(PRIMARY\s+KEY|UNIQUE(?:\s+NULLS\s+(?:NOT\s+)?DISTINCT)?|FOREIGN\s+KEY)\s*\(",
+    _FLAGS)
+NOT_A_COLUMN = {"constraint", "primary", "unique", "foreign", "check", "exclude", "like"}
+ADD_ACTION = re.compile(r"^ADD\s+(?:(COLUMN)\s+)?(?:IF\s+NOT\s+EXISTS\s+)?", _FLAGS)
+INDEX_COLUMN = re.compile(
+    rf"^({IDENT})(?:\s+(?:COLLATE\s+\S+|ASC|DESC|NULLS\s+(?:FIRST|LAST)|[\w.]+_ops))*$", _FLAGS)
+
+AUTH_CALL = re.compile(r"\b(auth\s*\.\s*(?:uid|jwt|role|email)|current_setting)\s*\(", _FLAGS)
+SELECT_AFTER_PAREN = re.compile(r"\(\s*SELECT\b", _FLAGS)
+POLICY_COLUMN = re.compile(
+    rf"({QNAME})\s*=\s*(?:\(\s*SELECT\s+)?auth\s*\.\s*uid\s*\(\s*\)"
+    rf"|auth\s*\.\s*uid\s*\(\s*\)\s*\)?\s*=\s*({QNAME})(?!\s*[(.])",
+    _FLAGS)
+DO_BLOCK = re.compile(r"^\s*DO\s+(?:LANGUAGE\s+\w+\s+)?(\$[A-Za-z_]*\$)", _FLAGS)
+EMBEDDED_DDL = re.compile(
+    r"\b(?:CREATE|ALTER|DROP)\s+(?:UNIQUE\s+)?(?:POLICY|TABLE|INDEX)\b", _FLAGS)
+IGNORE_COMMENT = re.compile(r"--\s*lint:\s*ignore\s+([\w-]+)")
+
+
+class Finding(NamedTuple):
+    path: str
+    line: int
+    rule: str
+    subject: str
+    message: str
+
+    def key(self):
+        return [Path(self.path).name, self.rule, self.subject]
+
+
+# ── identifiers and text helpers ──────────────────────────────────────────────
+
+def ident(name):
+    name = name.strip()
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.lower()
+
+
+def table_name(qname):
+    parts = [ident(p) for p in re.findall(IDENT, qname)]
+    return ".".join(parts) if len(parts) > 1 else f"public.{parts[0]}"
+
+
+def closing_paren(text, open_at):
+    """Index of the parenthesis closing text[open_at] (text must be masked)."""
+    depth = 0
+    for i in range(open_at, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
+
+
+def split_top(text, start=0, end=None):
+    """Split text[start:end] at top-level commas; yield (offset, part)."""
+    end = len(text) if end is None else end
+    depth, part_start = 0, start
+    for i in range(start, end):
+        ch = text[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            yield part_start, text[part_start:i]
+            part_start = i + 1
+    yield part_start, text[part_start:end]
+
+
+def _stripped(offset, part):
+    lead = len(part) - len(part.lstrip())
+    return offset + lead, part.strip()
+
+
+def column_list(text):
+    """Plain column names of an index/constraint column list; None for expressions."""
+    columns = []
+    for _, part in split_top(text):
+        match = INDEX_COLUMN.match(part.strip())
+        columns.append(ident(match.group(1)) if match else None)
+    return columns
+
+
+def in_subquery(text, pos):
+    """True if text[pos] is inside a parenthesised (SELECT ...) subquery."""
+    stack = []
+    for i in range(pos):
+        if text[i] == "(":
+            stack.append(bool(SELECT_AFTER_PAREN.match(text, i)))
+        elif text[i] == ")" and stack:
+            stack.pop()
+    return any(stack)
+
+
+# ── schema model ──────────────────────────────────────────────────────────────
+
+class Schema:
+    """Tables, indexes, foreign keys and policy columns as the chain leaves them."""
+
+    def __init__(self):
+        self.tables = set()
+        self.indexes = {}       # index key -> (table, [columns])
+        self.fks = {}           # (table, columns) -> (path, offset)
+        # (table, policy) -> {"auth": [(path, offset, call)],
+        #                     "columns": {column: (path, offset)}}
+        self.policies = {}
+        self._unnamed = 0
+
+    def add_index(self, table, columns, name=None):
+        if name is None:
+            self._unnamed += 1
+            name = f"{table}#{self._unnamed}"
+        self.indexes[name] = (table, columns)
+
+    def drop_table(self, table):
+        self.tables.discard(table)
+        self.indexes = {k: v for k, v in self.indexes.items() if v[0] != table}
+        self.fks = {k: v for k, v in self.fks.items() if k[0] != table}
+        self.policies = {k: v for k, v in self.policies.items() if k[0] != table}
+
+    def leading(self, table, count):
+        return [cols[:count] for t, cols in self.indexes.values() if t == table]
+
+    def covers(self, table, columns):
+        want = set(columns)
+        return any(len(lead) == len(columns) and set(lead) == want
+                   for lead in self.leading(table, len(columns)))
+
+    # ── statement handlers (text is the masked statement) ──
+
+    def column_def(self, table, text, offset, path):
+        name_match = re.match(IDENT, text)
+        if not name_match or ident(name_match.group()) in NOT_A_COLUMN:
+            return False
+        column = ident(name_match.group())
+        if COLUMN_PK.search(text) or COLUMN_UNIQUE.search(text):
+            self.add_index(table, [column])
+        ref = REFERENCES.search(text)
+        if ref:
+            self.fks[(table, (column,))] = (path, offset + ref.start())
+        return True
+
+    def table_constraint(self, table, text, offset, path):
+        match = TABLE_CONSTRAINT.match(text)
+        if not match:
+            return
+        close = closing_paren(text, match.end() - 1)
+        columns = column_list(text[match.end():close])
+        kind = match.group(1).upper()
+        if kind.startswith("FOREIGN"):
+            if None not in columns:
+                self.fks[(table, tuple(columns))] = (path, offset + match.start())
+        else:
+            self.add_index(table, columns)
+
+    def create_table(self, match, text, offset, path):
+        table = table_name(match.group(1))
+        self.tables.add(table)
+        open_at = match.end() - 1
+        for part_offset, part in split_top(text, open_at + 1, closing_paren(text, open_at)):
+            part_offset, part = _stripped(part_offset, part)
+            if part and not self.column_def(table, part, offset + part_offset, path):
+                self.table_constraint(table, part, offset + part_offset, path)
+
+    def alter_table(self, match, text, offset, path):
+        table = table_name(match.group(1))
+        for part_offset, part in split_top(text, match.end()):
+            part_offset, part = _stripped(part_offset, part)
+            add = ADD_ACTION.match(part)
+            if not add:
+                continue
+            rest_offset = offset + part_offset + add.end()
+            rest = part[add.end():]
+            if add.group(1) or not TABLE_CONSTRAINT.match(rest):
+                self.column_def(table, rest, rest_offset, path)
+            else:
+                self.table_constraint(table, rest, rest_offset, path)
+
+    def create_index(self, match, text):
+        table = table_name(match.group(2))
+        open_at = match.end() - 1
+        columns = column_list(text[open_at + 1:closing_paren(text, open_at)])
+        name = f"{table.split('.')[0]}.{ident(match.group(1))}" if match.group(1) else None
+        self.add_index(table, columns, name)
+
+    def drop_index(self, match):
+        for _, name in split_top(match.group(1)):
+            self.indexes.pop(table_name(name), None)
+
+    def policy(self, match, text, offset, path):
+        """CREATE/ALTER POLICY: (re)record its auth calls and auth.uid() columns."""
+        name, table = ident(match.group(1)), table_name(match.group(2))
+        body_at = match.end()
+        entry = {"auth": [], "columns": {}}
+        for call in AUTH_CALL.finditer(text, body_at):
+            if not in_subquery(text, call.start()):
+                entry["auth"].append((path, offset + call.start(),
+                                      re.sub(r"\s+", "", call.group(1))))
+        short = table.split(".")[-1]
+        for comparison in POLICY_COLUMN.finditer(text, body_at):
+            qname = comparison.group(1) or comparison.group(2)
+            parts = [ident(p) for p in re.findall(IDENT, qname)]
+            if len(parts) > 1 and parts[-2] != short:
+                continue
+            if in_subquery(text, comparison.start()):
+                continue
+            entry["columns"][parts[-1]] = (path, offset + comparison.start())
+        self.policies[(table, name)] = entry
+
+    def drop_policy(self, match):
+        self.policies.pop((table_name(match.group(2)), ident(match.group(1))), None)
+
+    def apply(self, text, offset, path):
+        """Update the model with one masked statement."""
+        flat = text.strip()
+        for pattern, handler in ((CREATE_TABLE, self.create_table),
+                                 (ALTER_TABLE, self.alter_table),
+                                 (POLICY, self.policy)):
+            match = pattern.match(flat)
+            if match:
+                handler(match, flat, offset + (len(text) - len(text.lstrip())), path)
+                return
+        match = CREATE_INDEX.match(flat)
+        if match:
+            self.create_index(match, flat)
+            return
+        match = DROP_POLICY.match(flat)
+        if match:
+            self.drop_policy(match)
+            return
+        match = DROP_INDEX.match(flat)
+        if match:
+            self.drop_index(match)
+            return
+        match = DROP_TABLE.match(flat)
+        if match:
+            for _, name in split_top(match.group(1)):
+                self.drop_table(table_name(name))
+
+
+# ── linting ───────────────────────────────────────────────────────────────────
+
+class SourceFile:
+    def __init__(self, path):
+        self.path = str(path)
+        self.text = Path(path).read_text(encoding="utf-8")
+        self.masked = mask_sql(self.text)
+        self.lines = self.text.splitlines()
+        self._newlines = [i for i, ch in enumerate(self.text) if ch == "\n"]
+
+    def line_at(self, offset):
+        return bisect_right(self._newlines, offset - 1) + 1
+
+    def ignored(self, line, rule):
+        for n in (line, line - 1):
+            if 1 <= n <= len(self.lines):
+                match = IGNORE_COMMENT.search(self.lines[n - 1])
+                if match and match.group(1) in (rule, "all"):
+                    return True
+        return False
+
+
+def embedded_statements(text):
+    """(offset, text) of DDL inside a DO $$ ... $$ block (text is masked).
+
+    Migrations here guard policies with "DO $$ ... IF NOT EXISTS ... THEN
+    CREATE POLICY ...; END IF; ... $$", so the block body is linted too.
+    """
+    match = DO_BLOCK.match(text)
+    if not match:
+        return
+    tag = match.group(1)
+    body_start = match.end()
+    body_end = text.find(tag, body_start)
+    body_end = len(text) if body_end == -1 else body_end
+    body = mask_sql(text[body_start:body_end])
+    for ddl in EMBEDDED_DDL.finditer(body):
+        end = body.find(";", ddl.start())
+        yield body_start + ddl.start(), body[ddl.start():len(body) if end == -1 else end]
+
+
+def build_schema(files):
+    schema = Schema()
+    for source in files:
+        for statement in split_statements(source.text):
+            start, end = statement.offset, statement.offset + len(statement.sql)
+            schema.apply(source.masked[start:end], start, source.path)
+            for offset, ddl in embedded_statements(source.text[start:end]):
+                schema.apply(ddl, start + offset, source.path)
+    return schema
+
+
+def lint(context_paths, report_paths=None):
+    """Lint the chain context_paths (in order); return findings in report_paths."""
+    files = [SourceFile(p) for p in context_paths]
+    by_path = {f.path: f for f in files}
+    report = {str(p) for p in (report_paths if report_paths is not None else context_paths)}
+    schema = build_schema(files)
+
+    raw = []
+    for (table, policy), entry in schema.policies.items():
+        for path, offset, call in entry["auth"]:
+            raw.append((path, offset, "auth-per-row", f"{table}:{policy}:{call}",
+                        f"policy {policy} on {table} calls {call}() per row; "
+                        f"use (select {call}()) so it is evaluated once per query"))
+        for column, (path, offset) in entry["columns"].items():
+            if table in schema.tables and not schema.covers(table, [column]):
+                raw.append((path, offset, "unindexed-policy-column",
+                            f"{table}.{column}:{policy}",
+                            f"policy {policy} filters {table}.{column} by auth.uid() but "
+                            f"no index on {table} starts with {column}"))
+    for (table, columns), (path, offset) in schema.fks.items():
+        if table in schema.tables and not schema.covers(table, columns):
+            cols = ", ".join(columns)
+            raw.append((path, offset, "unindexed-fk", f"{table}({cols})",
+                        f"foreign key {table}({cols}) has no index starting with "
+                        f"({cols}); add CREATE INDEX ... ON {table} ({cols})"))
+
+    findings = []
+    for path, offset, rule, subject, message in raw:
+        if path not in report:
+            continue
+        source = by_path[path]
+        line = source.line_at(offset)
+        if not source.ignored(line, rule):
+            findings.append(Finding(path, line, rule, subject, message))
+    findings.sort(key=lambda f: (Path(f.path).name, f.line, f.rule))
+    return findings
+
+
+def chain_paths(directory=MIGRATIONS_DIR, archive=True):
+    """The migration chain in apply order: _archive/ (optional), then top level."""
+    directory = Path(directory)
+    paths = migration_paths(directory / "_archive") if archive else []
+    return paths + migration_paths(directory)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {tuple(k) for k in json.load(f).get("findings", [])}
+    except FileNotFoundError:
+        return set()
+
+
+def write_baseline(path, findings, keep=()):
+    """Write the findings' keys, plus the keys in keep, as the baseline at path."""
+    keys = sorted({tuple(f.key()) for f in findings} | set(keep))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"findings": [list(k) for k in keys]}, f, indent=2)
+        f.write("\n")
+
+
+def split_baselined(findings, baseline):
+    new = [f for f in findings if tuple(f.key()) not in baseline]
+    old = [f for f in findings if tuple(f.key()) in baseline]
+    return new, old
+
+
+def display_path(path):
+    try:
+        return str(Path(path).resolve().relative_to(Path.cwd()))
+    except ValueError:
+        return str(path)
+
+
+def print_findings(findings, label=""):
+    for f in findings:
+        print(f"{display_path(f.path)}:{f.line}: {f.rule}{label}: {f.message}")
+
+
+def gate(directory, pending_paths, archive=True):
+    """Lint pending files against the chain; return findings not in the baseline."""
+    paths = chain_paths(directory, archive)
+    known = {p.resolve() for p in paths}
+    paths += [Path(p) for p in pending_paths if Path(p).resolve() not in known]
+    findings = lint(paths, [str(p) for p in paths if p.resolve() in
+                            {Path(q).resolve() for q in pending_paths}])
+    new, _ = split_baselined(findings, load_baseline(Path(directory) / BASELINE_NAME))
+    return new
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lint Supabase migrations for performance")
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR)
+    parser.add_argument("--no-archive", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline or args.dir / BASELINE_NAME
+    paths = chain_paths(args.dir, not args.no_archive)
+    if args.files:
+        known = {p.resolve() for p in paths}
+        unknown = False
+        for f in args.files:
+            if not Path(f).is_file():
+                print(f"ERROR: {f}: no such file", file=sys.stderr)
+                unknown = True
+            elif Path(f).resolve() not in known:
+                print(f"ERROR: {f}: not a migration in {display_path(args.dir)}"
+                      f"{' (--no-archive)' if args.no_archive else ''}", file=sys.stderr)
+                unknown = True
+        if unknown:
+            sys.exit(2)
+        wanted = {Path(f).resolve() for f in args.files}
+        report = [p for p in paths if p.resolve() in wanted]
+    else:
+        report = migration_paths(args.dir)
+    findings = lint(paths, report)
+
+    if args.write_baseline:
+        # With FILE arguments only their entries are replaced; the other
+        # migrations keep theirs.
+        linted = {p.name for p in report}
+        keep = [k for k in load_baseline(baseline_path) if k[0] not in linted]
+        write_baseline(baseline_path, findings, keep)
+        print(f"Baseline of {len(findings)} finding(s) written to {baseline_path}"
+              + (f" ({len(keep)} of other files kept)" if keep else ""))
+        return
+
+    new, old = split_baselined(findings, load_baseline(baseline_path))
+    print_findings(old, " (baselined)")
+    print_findings(new)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([{**finding._asdict(), "baselined": finding in old} for finding in findings],
+                      f, indent=2)
+
+    counts = ", ".join(f"{sum(f.rule == r for f in new)} {r}" for r in RULES)
+    print(f"\n{len(report)} file(s) linted: {len(new)} new finding(s) ({counts}), "
+          f"{len(old)} baselined.")
+    sys.exit(1 if new else 0)
+
+
+if __name__ == "__main__":
+    main()
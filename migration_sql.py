@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+SQL helpers shared by the migration tooling (apply_migration.py and friends)
+
+split_statements() splits a migration file into top-level statements the way
+psql would: semicolons inside quoted identifiers, string literals (including
+E'' escapes), dollar-quoted bodies ($$ ... $$, $fn$ ... $fn$) and comments
+do not end a statement. Every statement keeps the line it starts on, so
+callers can report file:line locations.
+
+mask_sql() blanks out comments and literal contents while keeping offsets
+and line breaks, for regex-based checks that must only see SQL code.
+"""
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+# Migrations directory; files in _archive/ are ignored like the Supabase CLI does.
+MIGRATIONS_DIR = Path(__file__).parent / "supabase" / "migrations"
+ARCHIVE_DIR = MIGRATIONS_DIR / "_archive"
+MIGRATION_NAME = re.compile(r"^\d+_[\w.-]+\.sql$")
+# Consolidated schema snapshot (migration_baseline.py), relative to the directory.
+BASELINE_NAME = Path("_baseline") / "schema.sql"
+
+_DOLLAR_TAG = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$")
+
+# Statements PostgreSQL refuses to run inside a transaction block, plus
+# ALTER TYPE ... ADD VALUE, whose new value is unusable until it commits.
+_NON_TRANSACTIONAL = re.compile(
+    r"""^(?:
+        CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY
+      | DROP\s+INDEX\s+CONCURRENTLY
+      | REINDEX\b.*\bCONCURRENTLY
+      | VACUUM\b
+      | (?:CREATE|DROP)\s+(?:DATABASE|TABLESPACE)\b
+      | ALTER\s+SYSTEM\b
+      | ALTER\s+TYPE\b.*\bADD\s+VALUE\b
+    )""",
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+# DML that rewrites existing rows: UPDATE/DELETE/MERGE and INSERT ... SELECT,
+# optionally behind a WITH clause. INSERT ... VALUES seeds are not backfills.
+_BACKFILL = re.compile(
+    r"^(?:WITH\b.*?\)\s*)?(?:UPDATE|DELETE|MERGE|INSERT\s+INTO\b(?:(?!\bVALUES\b).)*\bSELECT)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+_TRANSACTION_CONTROL = re.compile(
+    r"^(?:BEGIN|START\s+TRANSACTION|COMMIT|END|ROLLBACK|ABORT)\b(?!\s+ATOMIC)",
+    re.IGNORECASE,
+)
+
+# "-- online: begin" / "-- online: end" comment lines mark statements that
+# apply_migration.py --online must run in one transaction.
+_ONLINE_BLOCK = re.compile(r"--\s*online:\s*(begin|end)\s*$", re.IGNORECASE)
+
+# Migrations migration_baseline.py re-runs after the snapshot instead of
+# folding them into it: pg_cron registrations (the cron schema is not
+# dumped, and the job depends on the target's settings), and any migration
+# carrying a "-- baseline: replay" comment line.
+_BASELINE_REPLAY = re.compile(r"--\s*baseline:\s*replay\s*$", re.IGNORECASE)
+_CRON_SCHEDULE = re.compile(r"\bcron\s*\.\s*schedule(?:_in_database)?\s*\(", re.IGNORECASE)
+
+
+class Statement(NamedTuple):
+    sql: str     # statement text, without the terminating semicolon
+    line: int    # 1-based line the statement starts on
+    offset: int  # character offset of the statement in the file
+
+
+def migration_paths(directory=MIGRATIONS_DIR):
+    """<timestamp>_<name>.sql files directly in directory, in filename order."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted((p for p in directory.iterdir()
+                   if p.is_file() and MIGRATION_NAME.match(p.name)),
+                  key=lambda p: p.name)
+
+
+def _is_escape_string(sql, i):
+    """True if the quote at sql[i] opens an E'...' (backslash-escaped) literal."""
+    if i == 0 or sql[i - 1] not in "eE":
+        return False
+    return i < 2 or not (sql[i - 2].isalnum() or sql[i - 2] == "_")
+
+
+def _scan(sql):
+    """Yield (kind, start, end) spans: code, comment, string, ident, dollar."""
+    i, n = 0, len(sql)
+    code_start = 0
+    while i < n:
+        ch = sql[i]
+        nxt = sql[i + 1] if i + 1 < n else ""
+        if ch == "-" and nxt == "-":
+            end = sql.find("\n", i)
+            end = n if end == -1 else end
+            kind = "comment"
+        elif ch == "/" and nxt == "*":
+            depth, end = 1, i + 2
+            while end < n and depth:
+                if sql.startswith("/*", end):
+                    depth, end = depth + 1, end + 2
+                elif sql.startswith("*/", end):
+                    depth, end = depth - 1, end + 2
+                else:
+                    end += 1
+            kind = "comment"
+        elif ch == "'":
+            backslash = _is_escape_string(sql, i)
+            end = i + 1
+            while end < n:
+                if backslash and sql[end] == "\\":
+                    end += 2
+                elif sql[end] == "'":
+                    if sql.startswith("''", end):
+                        end += 2
+                    else:
+                        end += 1
+                        break
+                else:
+                    end += 1
+            kind = "string"
+        elif ch == '"':
+            end = i + 1
+            while end < n:
+                if sql.startswith('""', end):
+                    end += 2
+                elif sql[end] == '"':
+                    end += 1
+                    break
+                else:
+                    end += 1
+            kind = "ident"
+        elif ch == "$" and not (i > 0 and (sql[i - 1].isalnum() or sql[i - 1] == "_")):
+            match = _DOLLAR_TAG.match(sql, i)
+            if not match:
+                i += 1
+                continue
+            close = sql.find(match.group(), match.end())
+            end = n if close == -1 else close + len(match.group())
+            kind = "dollar"
+        else:
+            i += 1
+            continue
+        if code_start < i:
+            yield "code", code_start, i
+        yield kind, i, min(end, n)
+        i = code_start = min(end, n)
+    if code_start < n:
+        yield "code", code_start, n
+
+
+def _blank(text):
+    return re.sub(r"[^\n]", " ", text)
+
+
+def mask_sql(sql):
+    """Return sql with comments and literal contents replaced by spaces.
+
+    Offsets and newlines are preserved; quote characters and dollar tags are
+    kept, so '...' stays recognisable as a literal.
+    """
+    out = []
+    for kind, start, end in _scan(sql):
+        text = sql[start:end]
+        if kind in ("code", "ident"):
+            out.append(text)
+        elif kind == "comment":
+            out.append(_blank(text))
+        elif kind == "dollar":
+            tag = _DOLLAR_TAG.match(text).group()
+            closed = len(text) >= 2 * len(tag) and text.endswith(tag)
+            body = text[len(tag):len(text) - len(tag)] if closed else text[len(tag):]
+            out.append(tag + _blank(body) + (tag if closed else ""))
+        else:
+            closed = len(text) > 1 and text[-1] == text[0]
+            out.append(text[0] + _blank(text[1:-1] if closed else text[1:])
+                       + (text[-1] if closed else ""))
+    return "".join(out)
+
+
+def split_statements(sql):
+    """Split a SQL script into top-level Statements (empty statements dropped)."""
+    statements = []
+    start = None
+
+    def flush(end):
+        if start is not None:
+            text = sql[start:end].rstrip()
+            if text:
+                statements.append(Statement(text, sql.count("\n", 0, start) + 1, start))
+
+    for kind, s, e in _scan(sql):
+        if kind == "comment":
+            continue
+        if kind != "code":
+            if start is None:
+                start = s
+            continue
+        pos = s
+        while pos < e:
+            semi = sql.find(";", pos, e)
+            chunk_end = e if semi == -1 else semi
+            if start is None:
+                lead = len(sql[pos:chunk_end]) - len(sql[pos:chunk_end].lstrip())
+                if pos + lead < chunk_end:
+                    start = pos + lead
+            if semi == -1:
+                break
+            flush(semi)
+            start = None
+            pos = semi + 1
+    flush(len(sql))
+    return statements
+
+
+def online_blocks(sql):
+    """[(offset, "begin" | "end")] of the file's "-- online: begin/end" markers."""
+    markers = []
+    for kind, s, e in _scan(sql):
+        if kind == "comment":
+            match = _ONLINE_BLOCK.match(sql[s:e].rstrip())
+            if match:
+                markers.append((s, match.group(1).lower()))
+    return markers
+
+
+def replays_on_baseline(sql):
+    """True if a baseline must re-run this migration rather than cover it."""
+    for kind, s, e in _scan(sql):
+        if kind == "comment" and _BASELINE_REPLAY.match(sql[s:e].rstrip()):
+            return True
+        if kind in ("code", "dollar") and _CRON_SCHEDULE.search(sql[s:e]):
+            return True
+    return False
+
+
+def normalized(statement_sql):
+    """Statement code only, comments/literals masked, whitespace collapsed."""
+    return " ".join(mask_sql(statement_sql).split())
+
+
+def is_transaction_control(statement_sql):
+    return bool(_TRANSACTION_CONTROL.match(normalized(statement_sql)))
+
+
+def is_non_transactional(statement_sql):
+    return bool(_NON_TRANSACTIONAL.match(normalized(statement_sql)))
+
+
+def is_backfill(statement_sql):
+    return bool(_BACKFILL.match(normalized(statement_sql)))
+
+
+def summarize(statement_sql, width=60):
+    """One-line, width-limited rendering of a statement for reports."""
+    text = " ".join(statement_sql.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
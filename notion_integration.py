@@ -2,16 +2,113 @@
 """
 Notion API Integration Script for VAGUS App Documentation
 This script creates and manages comprehensive project documentation in Notion.
+
+All requests share one keep-alive session and go through a token bucket at
+Notion's average limit of 3 requests/second. A 429 is always retried after
+its Retry-After, and halves the bucket's rate, which then climbs back a
+little with every successful response. Requests that never reached Notion
+(connect errors and timeouts) are retried with jittered exponential
+backoff; read timeouts are not, since the request may have been processed.
+502/503/504 are retried only for idempotent requests, so a create or append
+is never sent twice. Latency and retry counters are in
+NotionIntegration.stats.
 """
 
 import requests
 import json
+import random
+import threading
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
 from typing import Dict, List, Any, Optional
 import os
 
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; return the time waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate: float):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+
+class RequestStats:
+    """Per-request latency and retry counters"""
+
+    def __init__(self):
+        self.requests = 0          # calls to the API, including retries
+        self.retries = 0
+        self.rate_limited = 0      # 429 responses
+        self.min_rate = None       # lowest rate the limiter backed off to
+        self.server_errors = 0     # 5xx responses
+        self.connection_errors = 0
+        self.failures = 0          # calls that still failed after retrying
+        self.throttled_seconds = 0.0
+        self.backoff_seconds = 0.0
+        self.latencies: List[float] = []
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'server_errors': self.server_errors,
+            'connection_errors': self.connection_errors,
+            'failures': self.failures,
+            'min_rate': self.min_rate,
+            'throttled_s': round(self.throttled_seconds, 2),
+            'backoff_s': round(self.backoff_seconds, 2),
+            'latency_p50_ms': round(percentile(0.50) * 1000),
+            'latency_p95_ms': round(percentile(0.95) * 1000),
+            'latency_max_ms': round(latencies[-1] * 1000) if latencies else 0,
+        }
+
+
 class NotionIntegration:
-    def __init__(self, token: str):
+    # Notion allows an average of 3 requests per second per integration
+    REQUESTS_PER_SECOND = 3.0
+    BURST = 3
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 0.5   # seconds; doubled per retry, with full jitter
+    BACKOFF_MAX = 30.0
+    TIMEOUT = 30
+    # After a 429 the rate is multiplied by RATE_DECREASE (not below
+    # RATE_MIN); each successful response adds RATE_INCREASE back.
+    RATE_DECREASE = 0.5
+    RATE_MIN = 0.25
+    RATE_INCREASE = 0.05
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(self, token: str, requests_per_second: float = REQUESTS_PER_SECOND):
         self.token = token
         self.headers = {
             'Authorization': f'Bearer {token}',
@@ -19,6 +116,89 @@ class NotionIntegration:
             'Notion-Version': '2022-06-28'
         }
         self.base_url = 'https://api.notion.com/v1'
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.requests_per_second = requests_per_second
+        self.bucket = TokenBucket(requests_per_second, self.BURST)
+        self.stats = RequestStats()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _not_sent(error: requests.RequestException) -> bool:
+        """True if the request failed before any of it reached the server."""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ReadTimeout) or not isinstance(error, requests.ConnectionError):
+            return False
+        reason = error.args[0] if error.args else None
+        if isinstance(reason, MaxRetryError):
+            reason = reason.reason
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+    def _slow_down(self):
+        rate = max(self.RATE_MIN, self.bucket.rate * self.RATE_DECREASE)
+        self.bucket.set_rate(rate)
+        if self.stats.min_rate is None or rate < self.stats.min_rate:
+            self.stats.min_rate = rate
+
+    def _speed_up(self):
+        if self.bucket.rate < self.requests_per_second:
+            self.bucket.set_rate(min(self.requests_per_second,
+                                     self.bucket.rate + self.RATE_INCREASE))
+
+    def _request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                 **kwargs) -> requests.Response:
+        """Send a request through the rate limiter, retrying what is safe to retry.
+
+        idempotent defaults to the method's semantics; pass True for a POST
+        that only reads (e.g. search).
+        """
+        if idempotent is None:
+            idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        for attempt in range(self.MAX_RETRIES + 1):
+            if attempt:
+                self.stats.retries += 1
+            self.stats.throttled_seconds += self.bucket.acquire()
+            self.stats.requests += 1
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=self.TIMEOUT, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.stats.latencies.append(time.perf_counter() - start)
+                self.stats.connection_errors += 1
+                if attempt == self.MAX_RETRIES or not self._not_sent(e):
+                    self.stats.failures += 1
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self.stats.latencies.append(time.perf_counter() - start)
+                if response.status_code == 429:
+                    self.stats.rate_limited += 1
+                    self._slow_down()
+                    try:
+                        delay = float(response.headers.get('Retry-After', ''))
+                    except ValueError:
+                        delay = self._backoff(attempt)
+                elif response.status_code >= 500:
+                    self.stats.server_errors += 1
+                    if not (idempotent and response.status_code in self.RETRY_STATUSES):
+                        self.stats.failures += 1
+                        return response
+                    delay = self._backoff(attempt)
+                else:
+                    self._speed_up()
+                    return response
+                if attempt == self.MAX_RETRIES:
+                    self.stats.failures += 1
+                    return response
+            self.stats.backoff_seconds += delay
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
 
     def search_pages(self, query: str = "") -> List[Dict]:
         """Search for pages in the workspace"""
@@ -32,7 +212,8 @@ class NotionIntegration:
         if query:
             data["query"] = query
 
-        response = requests.post(url, headers=self.headers, json=data)
+        # Search only reads, so it is safe to retry like a GET.
+        response = self._request('POST', url, idempotent=True, json=data)
         if response.status_code == 200:
             return response.json().get('results', [])
         else:
@@ -61,7 +242,7 @@ class NotionIntegration:
         if properties:
             data["properties"].update(properties)
 
-        response = requests.post(url, headers=self.headers, json=data)
+        response = self._request('POST', url, json=data)
         if response.status_code == 200:
             return response.json()
         else:
@@ -78,14 +259,11 @@ class NotionIntegration:
             chunk = blocks[i:i + chunk_size]
             data = {"children": chunk}
 
-            response = requests.patch(url, headers=self.headers, json=data)
+            response = self._request('PATCH', url, json=data)
             if response.status_code != 200:
                 print(f"Error adding blocks: {response.status_code} - {response.text}")
                 return False
 
-            # Rate limiting - be nice to Notion's API
-            time.sleep(0.1)
-
         return True
 
     def create_text_block(self, text: str, block_type: str = "paragraph") -> Dict:
@@ -365,7 +543,13 @@ def main():
 
     # Initialize the integration
     notion = NotionIntegration(token)
+    try:
+        run(notion)
+    finally:
+        notion.close()
+        print(f"\n📊 Notion API: {notion.stats.summary()}")
 
+def run(notion: NotionIntegration):
     # Test connection by searching for pages
     print("🔍 Searching for pages in your workspace...")
     pages = notion.search_pages()
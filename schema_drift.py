@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Schema drift between a live database and supabase/migrations/
+
+Compares the live catalog with the schema the migrations produce and lists
+tables, columns, indexes and policies that are missing from the database
+(in the migrations, not live), extra (live, not in the migrations) or
+changed (type, nullability, default, index or policy definition). This
+replaces reconciling db_tables.txt / missing_tables.txt by hand.
+
+Each side is one catalog query (migration_catalog.snapshot). The expected
+schema is built with migration_harness.py (a clone of its template, so the
+chain needs --base and a local Postgres as there), or read from another
+database with --expected-url, e.g. staging.
+
+Snapshots are cached in .oxbar/cache/schema-drift/:
+  - the expected one by the harness fingerprint (stub, base schema and
+    every migration checksum), so it is reused without touching Postgres
+    until a migration changes;
+  - a live one together with a catalog stamp (migration_catalog.stamp), so
+    it is re-read only after DDL or GRANTs. Checking the stamp costs one
+    small query.
+
+Usage:
+    python3 schema_drift.py [--db-url URL] [--expected-url URL]
+                            [--admin-url URL] [--base FILE] [--dir DIR]
+                            [--schema NAME ...] [--all] [--acl]
+                            [--refresh] [--json]
+
+    --db-url URL        Live database (default: $SUPABASE_DB_URL,
+                        then $DATABASE_URL)
+    --expected-url URL  Take the expected schema from this database instead
+                        of building it from the migrations
+    --admin-url, --base, --dir  As for migration_harness.py
+    --schema NAME       Schema to compare (repeatable; default: public)
+    --all               Also compare constraints, views, functions,
+                        triggers, sequences and types
+    --acl               Also compare grants (differ between Supabase and the
+                        harness stub, so off by default)
+    --refresh           Ignore cached snapshots
+    --json              Print the differences as JSON
+
+Exit codes:
+    0 — no drift
+    1 — drift found
+    2 — a database could not be read, or the chain failed to build
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+import migration_catalog
+from apply_migration import LEDGER_SCHEMA, connect
+from migration_harness import STUB_SCHEMAS, Harness, MigrationFailed
+from migration_sql import MIGRATIONS_DIR
+
+CACHE_DIR = Path(__file__).parent / ".oxbar" / "cache" / "schema-drift"
+
+KINDS = ("tables", "columns", "indexes", "policies")
+ALL_KINDS = KINDS + ("constraints", "views", "functions", "triggers", "sequences", "types")
+ACL_FIELDS = ("nspacl", "relacl", "attacl", "proacl")
+
+LABELS = {"tables": "table", "columns": "column", "indexes": "index",
+          "policies": "policy", "constraints": "constraint", "views": "view",
+          "functions": "function", "triggers": "trigger", "sequences": "sequence",
+          "types": "type"}
+
+# Kinds keyed (schema, table, ...): reported under their table when the
+# whole table is missing or extra.
+TABLE_CHILDREN = ("columns", "indexes", "policies", "constraints", "triggers")
+
+
+# ── snapshots ─────────────────────────────────────────────────────────────────
+
+def _cache_path(name):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return CACHE_DIR / f"{name}.json"
+
+
+def live_snapshot(conn, schemas, refresh=False):
+    """Snapshot of conn, from the cache while its catalog stamp is unchanged.
+
+    Returns (catalog, cached).
+    """
+    params = conn.info.dsn_parameters
+    identity = f"{params.get('host')}:{params.get('port')}/{params.get('dbname')}"
+    path = _cache_path("live-" + hashlib.sha256(identity.encode()).hexdigest()[:16])
+    current = migration_catalog.stamp(conn)
+    if not refresh:
+        catalog, meta = migration_catalog.load(path)
+        if catalog is not None and meta.get("stamp") == current \
+                and meta.get("schemas") == sorted(schemas):
+            return catalog, True
+    catalog = migration_catalog.snapshot(conn, include=schemas)
+    migration_catalog.save(path, catalog, stamp=current, schemas=sorted(schemas),
+                           database=identity)
+    return catalog, False
+
+
+def expected_snapshot(harness, schemas, refresh=False):
+    """Snapshot of the schema the chain produces, cached by its fingerprint.
+
+    Returns (catalog, cached).
+    """
+    path = _cache_path("expected-" + harness.template)
+    if not refresh:
+        catalog, meta = migration_catalog.load(path)
+        if catalog is not None and meta.get("schemas") == sorted(schemas):
+            return catalog, True
+    with harness.database() as url:
+        conn = psycopg2.connect(url, application_name="schema_drift")
+        try:
+            catalog = migration_catalog.snapshot(
+                conn, exclude=STUB_SCHEMAS + (LEDGER_SCHEMA,), include=schemas)
+        finally:
+            conn.close()
+    migration_catalog.save(path, catalog, schemas=sorted(schemas),
+                           migrations=len(harness.migrations))
+    return catalog, False
+
+
+# ── report ────────────────────────────────────────────────────────────────────
+
+def collapse(differences):
+    """Fold objects of missing/extra tables into their table's entry.
+
+    Returns [(Difference, {kind: count of folded objects})].
+    """
+    whole = {(d.key, d.change) for d in differences
+             if d.kind == "tables" and d.change != "changed"}
+    folded = {}
+    kept = []
+    for d in differences:
+        if d.kind in TABLE_CHILDREN and (d.key[:2], d.change) in whole:
+            counts = folded.setdefault((d.key[:2], d.change), {})
+            counts[d.kind] = counts.get(d.kind, 0) + 1
+        else:
+            kept.append(d)
+    return [(d, folded.get((d.key, d.change), {}) if d.kind == "tables" else {})
+            for d in kept]
+
+
+def _fields(kind, ignore_fields):
+    _, details, _ = migration_catalog.QUERIES[kind]
+    return [field for field in details if field not in ignore_fields]
+
+
+def changed_fields(d, ignore_fields=()):
+    fields = _fields(d.kind, ignore_fields)
+    return [(field, a, b) for field, a, b in zip(fields, d.expected, d.actual) if a != b]
+
+
+def print_report(entries, ignore_fields):
+    for d, folded in entries:
+        name = ".".join(str(part) for part in d.key)
+        extra = ""
+        if folded:
+            extra = "  (" + ", ".join(f"{n} {kind}" for kind, n in sorted(folded.items())) + ")"
+        print(f"  {d.change:8} {LABELS[d.kind]:10} {name}{extra}")
+        if d.change == "changed":
+            for field, a, b in changed_fields(d, ignore_fields):
+                print(f"  {'':8} {'':10}   {field}: {a!r} -> {b!r}")
+
+
+def as_json(entries, ignore_fields):
+    result = []
+    for d, folded in entries:
+        fields = _fields(d.kind, ignore_fields)
+        result.append({
+            "kind": d.kind,
+            "key": list(d.key),
+            "change": d.change,
+            "expected": dict(zip(fields, d.expected)) if d.expected is not None else None,
+            "actual": dict(zip(fields, d.actual)) if d.actual is not None else None,
+            "folded": folded,
+        })
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a live schema with the migrations")
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--expected-url", default=None)
+    parser.add_argument("--admin-url", default=None)
+    parser.add_argument("--base", type=Path, default=None)
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR)
+    parser.add_argument("--schema", action="append", dest="schemas", default=None)
+    parser.add_argument("--all", action="store_true")
+    parser.add_argument("--acl", action="store_true")
+    parser.add_argument("--refresh", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    schemas = args.schemas or ["public"]
+    kinds = ALL_KINDS if args.all else KINDS
+    ignore_fields = () if args.acl else ACL_FIELDS
+    start = time.perf_counter()
+    try:
+        conn = connect(args.db_url, application_name="schema_drift")
+        try:
+            actual, actual_cached = live_snapshot(conn, schemas, args.refresh)
+        finally:
+            conn.close()
+        if args.expected_url:
+            conn = connect(args.expected_url, application_name="schema_drift")
+            try:
+                expected, expected_cached = live_snapshot(conn, schemas, args.refresh)
+            finally:
+                conn.close()
+            source = "the expected database"
+        else:
+            harness = Harness(args.admin_url, args.dir, args.base)
+            expected, expected_cached = expected_snapshot(harness, schemas, args.refresh)
+            source = f"{len(harness.migrations)} migrations"
+    except MigrationFailed as e:
+        print(f"ERROR: Migration failed while building the expected schema:\n  {e}",
+              file=sys.stderr)
+        sys.exit(2)
+    except psycopg2.Error as e:
+        print(f"ERROR: Database error occurred:\n  {e}", file=sys.stderr)
+        sys.exit(2)
+
+    differences = migration_catalog.diff(
+        migration_catalog.only(expected, kinds, schemas, ignore_fields),
+        migration_catalog.only(actual, kinds, schemas, ignore_fields))
+    entries = collapse(differences)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(as_json(entries, ignore_fields), indent=2, default=str))
+    else:
+        print(f"Schema drift in {', '.join(schemas)}: live database vs {source} "
+              f"(missing = only in the migrations, extra = only live)")
+        print_report(entries, ignore_fields)
+        by_change = {}
+        for d, _ in entries:
+            by_change[d.change] = by_change.get(d.change, 0) + 1
+        summary = ", ".join(f"{n} {change}" for change, n in sorted(by_change.items()))
+        cache = " ".join(name for name, cached in (("expected", expected_cached),
+                                                   ("live", actual_cached)) if cached)
+        print(f"\n{summary or 'No drift'} in {elapsed * 1000:.0f} ms"
+              f"{f' (cached: {cache})' if cache else ''}")
+    sys.exit(1 if entries else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+HARBOR — locale parity, translation freshness and glossary checks in one process.
+
+Parses app_en.arb and every lib/l10n/app_<locale>.arb exactly once and runs the
+selected checks against the shared key sets:
+
+    parity      every EN key must exist in every target locale
+    freshness   EN value changes must be followed by translation changes
+                (see harbor_freshness_check.py; also writes
+                .oxbar/reports/harbor-stale.md)
+    glossary    translations of EN values that use a lib/l10n/glossary.json
+                term must use that term's rendering (see harbor_glossary.py)
+
+Usage:
+    python3 scripts/harbor.py [parity] [freshness] [glossary] [--days N] [--repo ROOT]
+                              [--since REV | --range A..B] [--jobs N] [--no-cache]
+                              [--report PATH] [--json PATH] [--enforce CHECK ...]
+    python3 scripts/harbor.py --watch [--interval SECONDS] [--days N] [--repo ROOT]
+
+    With no checks named, all of them run.
+    --report PATH   Markdown report, used as the PR comment body
+                    (default: harbor-report.md).
+    --json PATH     Machine-readable result of every check that ran
+                    (default: harbor-result.json).
+    --enforce CHECK Checks whose failures set exit code 1
+                    (default: every check that ran).
+    --watch         Stay running and re-check parity and freshness whenever a
+                    lib/l10n/*.arb file changes (see harbor_watch.py).
+    --interval S    Polling interval for --watch in seconds (default: 0.5).
+    The remaining options behave as in harbor_freshness_check.py.
+
+When GITHUB_OUTPUT is set, en_total and missing_<locale> (plus stale_<locale>
+and glossary_<locale> when those checks run) are appended to it.
+
+Exit codes:
+    0 — every enforced check passed
+    1 — an enforced check failed (reports written)
+    2 — l10n pipeline not bootstrapped (app_en.arb missing — TONGUE not done),
+        or a --since / --range revision is unknown
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from harbor_freshness_check import (
+    CACHE_PATH,
+    check_freshness,
+    human_join,
+    load_l10n,
+    locale_key_sets,
+    locale_label,
+    locale_owner,
+    write_report,
+)
+from harbor_glossary import GLOSSARY_PATH, check_glossary, load_glossary
+
+
+CHECKS = ("parity", "freshness", "glossary")
+REPORT_FILE = "harbor-report.md"
+JSON_FILE = "harbor-result.json"
+# Longest key list printed per locale in the PR comment.
+MAX_LISTED = 50
+
+
+# ── parity ────────────────────────────────────────────────────────────────────
+
+def check_parity(en_keys, locale_keys, locale_data):
+    """Return {"ok", "missing": {locale: [key]}, "status": {locale: str}}."""
+    missing = {loc: sorted(en_keys - keys) for loc, keys in locale_keys.items()}
+    status = {
+        loc: "FILE MISSING" if locale_data[loc] is None
+        else f"{len(locale_keys[loc])}/{len(en_keys)}"
+        for loc in locale_keys
+    }
+    return {"ok": not any(missing.values()), "missing": missing, "status": status}
+
+
+def parity_markdown(result, en_data, locales):
+    en_total = len(en_data)
+    files = [f"`{path.name}`" for path in locales.values()]
+
+    if result["ok"]:
+        both = "both " if len(files) == 2 else ""
+        return (
+            f"## HARBOR Locale Parity ✅\n\n"
+            f"All {en_total} EN keys are present in {both}{human_join(files)}.\n"
+        )
+
+    missing = result["missing"]
+    lines = []
+    lines.append("## HARBOR Locale Parity ❌\n")
+    summary = " · ".join(
+        f"**{len(missing[loc])} key(s) missing in {locale_label(loc)}**" for loc in locales
+    )
+    lines.append(f"> {summary}\n")
+    table = ["| Locale | Status |", "|--------|--------|",
+             f"| EN     | {en_total} keys (source of truth) |"]
+    table += [
+        f"| {loc.upper():6} | {result['status'][loc]} — owner: **{locale_owner(loc)}** |"
+        for loc in locales
+    ]
+    lines.append("\n".join(table) + "\n")
+    lines.append("\n---\n")
+
+    for loc, path in locales.items():
+        keys = missing[loc]
+        if not keys:
+            continue
+        terms = "Sorani" if loc == "ku" else "fitness"
+        lines.append(f"### Missing in `{path.name}` ({len(keys)} keys)\n")
+        lines.append(f"Add these keys to `{path.as_posix()}`. "
+                     f"Consult `lib/l10n/glossary.json` for consistent {terms} terminology.\n")
+        lines.append("```")
+        for k in keys[:MAX_LISTED]:
+            safe = str(en_data[k]).replace("`", "'")
+            lines.append(f'"{k}": "{safe}"')
+        if len(keys) > MAX_LISTED:
+            lines.append(f"... and {len(keys) - MAX_LISTED} more")
+        lines.append("```\n")
+
+    lines.append("---\n")
+    lines.append(
+        "_Enforced by HARBOR. Do not merge until all locales are in parity. "
+        "If you believe a string should be exempt, add `// harbor-exempt` comment "
+        "in the source and open a separate PR for OXBAR review._"
+    )
+    return "\n".join(lines)
+
+
+# ── freshness ─────────────────────────────────────────────────────────────────
+
+def freshness_markdown(result, threshold_days, locales):
+    stale = result["stale"]
+    total = sum(len(v) for v in stale.values())
+    scope = result["scope"] or "all EN keys"
+
+    if total == 0:
+        return (
+            f"## HARBOR Translation Freshness ✅\n\n"
+            f"No stale translations ({scope}; threshold {threshold_days} days).\n"
+        )
+
+    lines = ["## HARBOR Translation Freshness ⚠️\n",
+             f"> {scope}; threshold {threshold_days} days.\n",
+             "| Locale | Stale | Owner |",
+             "|--------|-------|-------|"]
+    lines += [f"| {loc.upper():6} | {len(stale[loc]):5} | **{locale_owner(loc)}** |"
+              for loc in locales]
+    lines.append("")
+    for loc, path in locales.items():
+        entries = sorted(stale[loc])
+        if not entries:
+            continue
+        lines.append(f"### Stale in `{path.name}` ({len(entries)} keys)\n")
+        lines.append("```")
+        for key, en_date, tr_date in entries[:MAX_LISTED]:
+            tr_str = tr_date.strftime("%Y-%m-%d") if tr_date else "never"
+            lines.append(f"{key}  (EN {en_date:%Y-%m-%d}, {loc.upper()} {tr_str})")
+        if len(entries) > MAX_LISTED:
+            lines.append(f"... and {len(entries) - MAX_LISTED} more")
+        lines.append("```\n")
+    return "\n".join(lines)
+
+
+# ── glossary ──────────────────────────────────────────────────────────────────
+
+def glossary_markdown(result, locales):
+    violations = result["violations"]
+    total = sum(len(v) for v in violations.values())
+
+    if total == 0:
+        return (
+            f"## HARBOR Glossary Consistency ✅\n\n"
+            f"Every translation uses the `{GLOSSARY_PATH.as_posix()}` rendering "
+            f"of the terms in its EN value.\n"
+        )
+
+    lines = ["## HARBOR Glossary Consistency ⚠️\n",
+             f"> Translations that do not use the `{GLOSSARY_PATH.as_posix()}` "
+             f"rendering of a term in the EN value.\n",
+             "| Locale | Violations | Owner |",
+             "|--------|------------|-------|"]
+    lines += [f"| {loc.upper():6} | {len(violations[loc]):10} | **{locale_owner(loc)}** |"
+              for loc in locales]
+    lines.append("")
+    for loc, path in locales.items():
+        entries = violations[loc]
+        if not entries:
+            continue
+        lines.append(f"### `{path.name}` ({len(entries)} violations)\n")
+        lines.append("```")
+        for key, term_id, expected in entries[:MAX_LISTED]:
+            lines.append(f"{key}  ({term_id} → {expected})")
+        if len(entries) > MAX_LISTED:
+            lines.append(f"... and {len(entries) - MAX_LISTED} more")
+        lines.append("```\n")
+    return "\n".join(lines)
+
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="HARBOR locale checks")
+    parser.add_argument("checks", nargs="*", metavar="CHECK",
+                        help=f"Checks to run: {', '.join(CHECKS)} (default: all)")
+    parser.add_argument("--days", type=int, default=30,
+                        help="Staleness threshold in days (default: 30)")
+    parser.add_argument("--repo", type=str, default=".",
+                        help="Path to git repo root (default: current directory)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Rebuild key history from scratch instead of using {CACHE_PATH}")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes for history building "
+                             "(default: CPU count; 1 disables the pool)")
+    scope_group = parser.add_mutually_exclusive_group()
+    scope_group.add_argument("--since", metavar="REV",
+                             help="Only check EN keys changed since REV (PR mode)")
+    scope_group.add_argument("--range", metavar="A..B", dest="rev_range",
+                             help="Only check EN keys changed in the range A..B")
+    parser.add_argument("--report", default=REPORT_FILE,
+                        help=f"Markdown report path (default: {REPORT_FILE})")
+    parser.add_argument("--json", default=JSON_FILE, dest="json_path",
+                        help=f"JSON result path (default: {JSON_FILE})")
+    parser.add_argument("--enforce", nargs="+", metavar="CHECK",
+                        help="Checks whose failures set exit code 1 (default: all run)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-check on every ARB edit")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Polling interval for --watch in seconds (default: 0.5)")
+    args = parser.parse_args()
+
+    checks = args.checks or list(CHECKS)
+    unknown = set(checks) - set(CHECKS) | set(args.enforce or []) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(sorted(unknown))}")
+    enforce = set(args.enforce or checks)
+
+    os.chdir(args.repo)
+
+    if args.watch:
+        from harbor_watch import run_watch
+        run_watch(args.days, interval=args.interval,
+                  use_cache=not args.no_cache, jobs=args.jobs)
+        sys.exit(0)
+
+    en_data, locales, locale_data = load_l10n()
+    if en_data is None:
+        print(
+            "HARBOR: app_en.arb not found. "
+            "TONGUE has not bootstrapped the i18n pipeline yet. "
+            "Checks skipped.",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+
+    en_keys = set(en_data)
+    locale_keys = locale_key_sets(locale_data)
+
+    result = {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "en_total": len(en_keys),
+        "locales": {
+            loc: {"file": path.as_posix(), "exists": locale_data[loc] is not None,
+                  "keys": len(locale_keys[loc])}
+            for loc, path in locales.items()
+        },
+    }
+    sections = []
+    outputs = {"en_total": len(en_keys)}
+
+    if "parity" in checks:
+        parity = check_parity(en_keys, locale_keys, locale_data)
+        print(f"EN keys  : {len(en_keys)}")
+        for loc in locales:
+            print(f"{loc.upper()} keys  : {parity['status'][loc]}")
+        for loc in locales:
+            print(f"Missing {loc.upper()}: {len(parity['missing'][loc])}")
+            outputs[f"missing_{loc}"] = len(parity["missing"][loc])
+        if parity["ok"]:
+            print("\nAll locales in parity. ✓")
+        result["parity"] = {"ok": parity["ok"], "missing": parity["missing"]}
+        sections.append(parity_markdown(parity, en_data, locales))
+
+    if "freshness" in checks:
+        freshness = check_freshness(
+            en_keys, locale_keys, locales, args.days,
+            jobs=args.jobs, use_cache=not args.no_cache,
+            since=args.since, rev_range=args.rev_range,
+        )
+        total = write_report(freshness["stale"], freshness["missing"], args.days,
+                             en_data, freshness["scope"])
+        for loc in locales:
+            outputs[f"stale_{loc}"] = len(freshness["stale"][loc])
+        result["freshness"] = {
+            "ok": total == 0,
+            "threshold_days": args.days,
+            "scope": freshness["scope"],
+            "checked": freshness["checked"],
+            "stale": {
+                loc: [{"key": key, "en_changed": _iso(en_date),
+                       "translation_changed": _iso(tr_date)}
+                      for key, en_date, tr_date in sorted(entries)]
+                for loc, entries in freshness["stale"].items()
+            },
+            "missing": {loc: sorted(keys) for loc, keys in freshness["missing"].items()},
+        }
+        sections.append(freshness_markdown(freshness, args.days, locales))
+
+    if "glossary" in checks:
+        terms = load_glossary()
+        if terms is None:
+            print(f"HARBOR: {GLOSSARY_PATH} not found — glossary check skipped.")
+            glossary = {"ok": True, "violations": {loc: [] for loc in locales}}
+        else:
+            glossary = check_glossary(terms, en_data, locale_data)
+        for loc in locales:
+            count = len(glossary["violations"][loc])
+            print(f"Glossary {loc.upper()}: {count} violation(s)")
+            outputs[f"glossary_{loc}"] = count
+        result["glossary"] = {
+            "ok": glossary["ok"],
+            "terms": len(terms or []),
+            "violations": {
+                loc: [{"key": key, "term": term_id, "expected": expected}
+                      for key, term_id, expected in entries]
+                for loc, entries in glossary["violations"].items()
+            },
+        }
+        sections.append(glossary_markdown(glossary, locales))
+
+    failed = sorted(check for check in checks
+                    if check in enforce and not result[check]["ok"])
+    result["enforced"] = sorted(enforce & set(checks))
+    result["exit_code"] = 1 if failed else 0
+
+    report = "\n\n---\n\n".join(sections)
+    with open(args.report, "w", encoding="utf-8") as f:
+        f.write(report)
+    with open(args.json_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    gho = os.environ.get("GITHUB_OUTPUT")
+    if gho:
+        with open(gho, "a") as f:
+            for name, value in outputs.items():
+                f.write(f"{name}={value}\n")
+
+    if failed:
+        print("\n" + report)
+        print(f"\nHARBOR: {', '.join(failed)} failed. "
+              f"See {args.report} / {args.json_path}.")
+        sys.exit(1)
+
+    print(f"\nHARBOR: {', '.join(checks)} passed.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
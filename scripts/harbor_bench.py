@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+HARBOR — benchmark for harbor_freshness_check.
+
+Generates throwaway git repositories with synthetic EN/AR/KU ARB histories
+(through one `git fast-import` stream per repo), runs
+harbor_freshness_check.main against each one and records end-to-end and
+per-phase wall-clock times as JSON. A previous result can be passed as a
+baseline to fail on regressions.
+
+Usage:
+    python3 scripts/harbor_bench.py [--commits 100,1000] [--keys 1000,5000]
+                                    [--churn-en F] [--churn-tr F] [--touch P]
+                                    [--repeat N] [--jobs N] [--seed N] [--out PATH]
+                                    [--baseline PATH] [--threshold F] [--keep]
+
+    --commits LIST   Commit counts to generate (comma-separated, default 100,1000).
+    --keys LIST      EN key counts to generate (comma-separated, default 1000,5000).
+    --churn-en F     Fraction of EN keys edited by a commit touching app_en.arb
+                     (default: 0.005).
+    --churn-tr F     Same for app_ar.arb / app_ku.arb (default: 0.003).
+    --touch P        Probability that a commit touches each ARB file (default: 0.5).
+    --repeat N       Timed runs per case and mode; the median is recorded (default: 3).
+    --jobs N         Passed through to harbor_freshness_check --jobs.
+    --seed N         Random seed for the generated histories (default: 0); the
+                     same seed gives the same repositories.
+    --out PATH       Result file (default: .oxbar/reports/harbor-bench.json).
+    --baseline PATH  Earlier result to compare against.
+    --threshold F    Allowed slowdown versus the baseline, as a fraction
+                     (default: 0.2 = 20%).
+    --keep           Keep the generated repositories (paths are printed).
+
+Every case is measured in two modes: "cold" (--no-cache, full history walk)
+and "warm" (history cache already up to date).
+
+Exit codes:
+    0 — benchmark finished (and no regression against the baseline)
+    1 — at least one case regressed beyond --threshold
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import harbor_freshness_check as harbor
+
+
+OUT_PATH = Path(".oxbar/reports/harbor-bench.json")
+LOCALES = ("en", "ar", "ku")
+MODES = ("cold", "warm")
+# Synthetic commits are an hour apart, starting here.
+EPOCH = 1_600_000_000
+
+
+# ── synthetic repository ──────────────────────────────────────────────────────
+
+def _arb_bytes(locale, values):
+    return json.dumps({"@@locale": locale, **values}, ensure_ascii=False,
+                      indent=2).encode("utf-8")
+
+
+def generate_repo(path, commits, keys, churn_en, churn_tr, touch, seed=0):
+    """
+    Create a git repo at path with `commits` commits of lib/l10n/app_*.arb.
+
+    The first commit adds `keys` keys to every locale; each later commit
+    touches each file with probability `touch` and rewrites round(keys * churn)
+    of its values (at least one).
+    """
+    rng = random.Random(seed)
+    key_names = [f"key{i:05d}" for i in range(keys)]
+    values = {loc: {k: f"{loc} {k} v0" for k in key_names} for loc in LOCALES}
+    churn = {"en": churn_en, "ar": churn_tr, "ku": churn_tr}
+
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    proc = subprocess.Popen(["git", "fast-import", "--quiet"],
+                            stdin=subprocess.PIPE, cwd=path)
+    out = proc.stdin
+
+    def data(payload):
+        out.write(f"data {len(payload)}\n".encode())
+        out.write(payload)
+        out.write(b"\n")
+
+    for n in range(commits):
+        ts = EPOCH + n * 3600
+        out.write(f"commit refs/heads/main\nmark :{n + 1}\n".encode())
+        out.write(f"author Bench <bench@example.com> {ts} +0000\n".encode())
+        out.write(f"committer Bench <bench@example.com> {ts} +0000\n".encode())
+        data(f"bench commit {n}".encode())
+        if n:
+            out.write(f"from :{n}\n".encode())
+        for loc in LOCALES:
+            if n and rng.random() >= touch:
+                continue
+            if n:
+                for key in rng.sample(key_names, max(1, round(keys * churn[loc]))):
+                    values[loc][key] = f"{loc} {key} v{n}"
+            out.write(f"M 100644 inline lib/l10n/app_{loc}.arb\n".encode())
+            data(_arb_bytes(loc, values[loc]))
+    out.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+    subprocess.run(["git", "reset", "-q", "--hard"], cwd=path, check=True)
+
+
+# ── timing ────────────────────────────────────────────────────────────────────
+
+def time_main(repo, extra_args):
+    """Run harbor_freshness_check.main once; return (total_seconds, phases)."""
+    cwd = os.getcwd()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            harbor.main(["--repo", str(repo), *extra_args])
+    except SystemExit as e:
+        if e.code not in (0, 1):
+            raise RuntimeError(f"harbor_freshness_check exited with {e.code}")
+    finally:
+        os.chdir(cwd)
+    return time.perf_counter() - start, dict(harbor.PHASE_TIMINGS)
+
+
+def run_case(repo, repeat, jobs):
+    """Return {mode: {"total": s, "phases": {phase: s}, "runs": [s, ...]}}."""
+    base = ["--jobs", str(jobs)] if jobs else []
+    results = {}
+    for mode in MODES:
+        args = base + (["--no-cache"] if mode == "cold" else [])
+        if mode == "warm":
+            time_main(repo, base)  # make sure the cache is current
+        runs = [time_main(repo, args) for _ in range(repeat)]
+        totals = [total for total, _ in runs]
+        phases = sorted(runs[0][1])
+        results[mode] = {
+            "total": statistics.median(totals),
+            "phases": {p: statistics.median(r[1].get(p, 0.0) for r in runs) for p in phases},
+            "runs": totals,
+        }
+    return results
+
+
+def case_id(case):
+    return (f"c{case['commits']}-k{case['keys']}-en{case['churn_en']}"
+            f"-tr{case['churn_tr']}-t{case['touch']}")
+
+
+def compare(result, baseline, threshold):
+    """Print per-case deltas; return the list of regressed (case, mode) ids."""
+    previous = {case_id(c): c for c in baseline.get("cases", [])}
+    regressions = []
+    for case in result["cases"]:
+        old = previous.get(case_id(case))
+        if old is None:
+            continue
+        for mode in MODES:
+            before = old["modes"].get(mode, {}).get("total")
+            after = case["modes"][mode]["total"]
+            if not before:
+                continue
+            ratio = after / before
+            flag = "REGRESSION" if ratio > 1 + threshold else ""
+            print(f"  {case_id(case):40} {mode:5} {before:8.3f}s → {after:8.3f}s "
+                  f"({(ratio - 1) * 100:+6.1f}%) {flag}")
+            if flag:
+                regressions.append(f"{case_id(case)}/{mode}")
+    return regressions
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="HARBOR freshness benchmark")
+    parser.add_argument("--commits", type=_int_list, default=[100, 1000])
+    parser.add_argument("--keys", type=_int_list, default=[1000, 5000])
+    parser.add_argument("--churn-en", type=float, default=0.005)
+    parser.add_argument("--churn-tr", type=float, default=0.003)
+    parser.add_argument("--touch", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=OUT_PATH)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    git_version = subprocess.run(["git", "--version"], capture_output=True,
+                                 text=True).stdout.strip()
+    result = {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "git": git_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "cases": [],
+    }
+
+    workdir = Path(tempfile.mkdtemp(prefix="harbor-bench-"))
+    try:
+        for commits, keys in itertools.product(args.commits, args.keys):
+            case = {"commits": commits, "keys": keys, "churn_en": args.churn_en,
+                    "churn_tr": args.churn_tr, "touch": args.touch}
+            repo = workdir / case_id(case)
+            start = time.perf_counter()
+            generate_repo(repo, commits, keys, args.churn_en, args.churn_tr,
+                          args.touch, seed=args.seed)
+            case["generate_seconds"] = time.perf_counter() - start
+            case["modes"] = run_case(repo, args.repeat, args.jobs)
+            result["cases"].append(case)
+
+            phases = ", ".join(f"{p} {t:.3f}s"
+                               for p, t in case["modes"]["cold"]["phases"].items())
+            print(f"{case_id(case):40} cold {case['modes']['cold']['total']:8.3f}s "
+                  f"warm {case['modes']['warm']['total']:8.3f}s  ({phases})")
+            if args.keep:
+                print(f"  kept: {repo}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,37 +3,74 @@
 HARBOR — weekly translation freshness check.
 
 Flags any key in app_en.arb whose English value was changed more recently than
-the corresponding AR/KU translation. Outputs a stale-translation report to
-.oxbar/reports/harbor-stale.md.
+the corresponding translation in every lib/l10n/app_<locale>.arb (AR and KU are
+always checked, even before their files exist). Outputs a stale-translation
+report to .oxbar/reports/harbor-stale.md.
 
 Usage:
-    python3 scripts/harbor_freshness_check.py [--days N] [--repo ROOT]
+    python3 scripts/harbor_freshness_check.py [--days N] [--repo ROOT] [--no-cache]
+                                              [--jobs N] [--since REV | --range A..B]
 
     --days N      Staleness threshold in days (default: 30).
                   A translation is stale when its last git-change is more than
                   N days older than the EN key's last git-change.
     --repo ROOT   Path to git repo root (default: current directory).
+    --no-cache    Ignore .oxbar/cache/harbor-history.json and rebuild the key
+                  history from the first commit (the cache is still rewritten).
+    --jobs N      Worker processes for building per-locale histories
+                  (default: CPU count; 1 disables the pool).
+    --since REV   PR mode: only check EN keys whose value changed between
+                  merge-base(REV, HEAD) and HEAD. Shorthand for --range REV..HEAD.
+    --range A..B  PR mode over an explicit range (A...B is accepted too).
+                  Only the touched keys are dated, each walk stops as soon as
+                  they all are, and the history cache is not used.
 
 Exit codes:
     0 — no stale translations found
     1 — one or more stale translations found (report written)
-    2 — l10n pipeline not bootstrapped (app_en.arb missing — TONGUE not done)
+    2 — l10n pipeline not bootstrapped (app_en.arb missing — TONGUE not done),
+        or a --since / --range revision is unknown
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
 
-ARB_EN = Path("lib/l10n/app_en.arb")
-ARB_AR = Path("lib/l10n/app_ar.arb")
-ARB_KU = Path("lib/l10n/app_ku.arb")
+L10N_DIR = Path("lib/l10n")
+SOURCE_LOCALE = "en"
+ARB_EN = L10N_DIR / f"app_{SOURCE_LOCALE}.arb"
+# Target locales checked even when their ARB file does not exist yet.
+REQUIRED_LOCALES = ("ar", "ku")
+LOCALE_NAMES = {
+    "ar": "Arabic",
+    "ku": "Kurdish-Sorani",
+}
 REPORT_PATH = Path(".oxbar/reports/harbor-stale.md")
+CACHE_PATH = Path(".oxbar/cache/harbor-history.json")
+CACHE_VERSION = 1
+
+# Wall-clock seconds per phase of the last check (read by harbor_bench.py).
+PHASE_TIMINGS = {}
+
+
+@contextmanager
+def timed(phase):
+    """Accumulate the wall-clock time of a block into PHASE_TIMINGS[phase]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_TIMINGS[phase] = PHASE_TIMINGS.get(phase, 0.0) + time.perf_counter() - start
 
 
 # ── git helpers ──────────────────────────────────────────────────────────────
@@ -46,9 +83,13 @@ def git(*args, cwd=None):
     return result.stdout.strip()
 
 
-def get_commit_log(file_path):
-    """Return list of (commit_hash, timestamp) for all commits touching file."""
-    raw = git("log", "--format=%H %aI", "--", str(file_path))
+def get_commit_log(file_path, rev_range=None):
+    """Return list of (commit_hash, timestamp) for all commits touching file.
+
+    rev_range (e.g. "abc123..HEAD") restricts the walk to part of history.
+    """
+    revs = [rev_range] if rev_range else []
+    raw = git("log", "--format=%H %aI", *revs, "--", str(file_path))
     entries = []
     for line in raw.splitlines():
         parts = line.split(" ", 1)
@@ -63,9 +104,52 @@ def get_commit_log(file_path):
     return entries  # newest first
 
 
+def is_ancestor(commit_hash, rev="HEAD"):
+    """True if commit_hash exists and is an ancestor of (or equal to) rev."""
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", commit_hash, rev],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def resolve_rev_range(since=None, rev_range=None):
+    """Return (base_commit, head_rev) for --since / --range.
+
+    The base is merge-base(A, B) so changes that landed on A after the branch
+    point are not attributed to the range. Exits with 2 when either end is not
+    a known commit (mistyped, or not fetched) or the two share no history.
+    """
+    if since:
+        start, end = since, "HEAD"
+    else:
+        sep = "..." if "..." in rev_range else ".."
+        start, _, end = rev_range.partition(sep)
+        start, end = start or "HEAD", end or "HEAD"
+    for rev in (start, end):
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"HARBOR: unknown revision {rev!r} (mistyped, or not fetched?).",
+                  file=sys.stderr)
+            sys.exit(2)
+    result = subprocess.run(["git", "merge-base", start, end], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"HARBOR: {start} and {end} have no common ancestor.", file=sys.stderr)
+        sys.exit(2)
+    return result.stdout.strip(), end
+
+
 def get_arb_at_commit(commit_hash, file_path):
     """Return parsed ARB dict at a specific commit, or {} on failure."""
     content = git("show", f"{commit_hash}:{file_path}")
+    return parse_arb_text(content)
+
+
+def parse_arb_text(content):
+    """Parse ARB JSON text into a dict of user-facing keys, or {} on failure."""
     if not content:
         return {}
     try:
@@ -76,44 +160,313 @@ def get_arb_at_commit(commit_hash, file_path):
         return {}
 
 
-def build_key_history(file_path, keys_of_interest):
+class GitBlobReader:
+    """
+    One long-lived `git cat-file --batch` process.
+
+    Reading a file at N commits through this costs one process spawn instead
+    of N `git show` forks.
+    """
+
+    def __init__(self, cwd=None):
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=cwd,
+        )
+
+    def read(self, commit_hash, file_path):
+        """Return (blob_sha, content) of file_path at commit, or (None, "")."""
+        spec = f"{commit_hash}:{Path(file_path).as_posix()}\n"
+        self._proc.stdin.write(spec.encode("utf-8"))
+        self._proc.stdin.flush()
+
+        header = self._proc.stdout.readline().decode("utf-8").rstrip("\n")
+        if header.endswith((" missing", " ambiguous")):
+            # "<spec> missing" / "<spec> ambiguous" — path absent at this commit.
+            # Checked on the suffix: the spec's path may itself contain spaces.
+            return None, ""
+        sha, kind, size = header.rsplit(" ", 2)
+        body = self._proc.stdout.read(int(size))
+        self._proc.stdout.read(1)  # trailing LF after every object
+        if kind != "blob":
+            return None, ""
+        return sha, body.decode("utf-8", errors="replace").strip()
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def snapshot_hashes(data):
+    """
+    Compact {key: hash(value)} map of a parsed ARB snapshot.
+
+    Uses the builtin (per-process) hash — these maps are only compared within
+    a run; value_hash() is the stable digest persisted in the cache. Null
+    values are dropped so they compare equal to a missing key, as .get() does.
+    """
+    return {
+        key: hash(value if isinstance(value, str)
+                  else json.dumps(value, sort_keys=True, ensure_ascii=False))
+        for key, value in data.items() if value is not None
+    }
+
+
+def changed_keys(current, parent):
+    """Keys added, removed or edited between two snapshot_hashes() maps."""
+    return {key for key, _ in current.items() ^ parent.items()}
+
+
+def iter_arb_revisions(reader, file_path, commits, hashed=False):
+    """
+    Yield the parsed ARB snapshot at each commit, in the order given.
+
+    Each blob is parsed once; consecutive commits that resolve to the same
+    blob (e.g. merges) get the very same snapshot object back. With
+    hashed=True the snapshots are snapshot_hashes() maps.
+    """
+    last_sha, last_data = None, {}
+    for commit_hash, _ in commits:
+        sha, content = reader.read(commit_hash, file_path)
+        if sha is None:
+            yield {}
+            continue
+        if sha != last_sha:
+            last_sha, last_data = sha, parse_arb_text(content)
+            if hashed:
+                last_data = snapshot_hashes(last_data)
+        yield last_data
+
+
+def _walk_history(reader, file_path, commits, remaining, base_data=None):
+    """
+    Date key changes across commits (newest first).
+
+    Compares each commit's snapshot to the next-older one; the oldest commit
+    is compared to base_data ({} when walking from the first commit). Returns
+    {key: (commit_hash, commit_dt)} for every key in remaining that changed,
+    or for every key that changed at all when remaining is None.
+
+    Snapshots are per-key hash maps, so each commit costs one C-level set
+    difference plus Python work proportional to the keys it changed. Dated
+    keys leave the working set immediately and the walk stops as soon as
+    nothing of interest remains.
+    """
+    changed = {}
+    track_all = remaining is None
+    remaining = set() if track_all else set(remaining)
+    snapshots = iter_arb_revisions(reader, file_path, commits, hashed=True)
+    base = snapshot_hashes(base_data or {})
+
+    # Seed: current state
+    prev = next(snapshots, {})
+
+    for commit_hash, commit_dt in commits:
+        if not track_all and not remaining:
+            break
+
+        # Past the oldest commit — compare against the base snapshot.
+        parent = next(snapshots, base)
+
+        if parent is not prev:
+            diff = changed_keys(prev, parent)
+            if track_all:
+                for key in diff:
+                    changed.setdefault(key, (commit_hash, commit_dt))
+            else:
+                hits = diff & remaining
+                for key in hits:
+                    changed[key] = (commit_hash, commit_dt)
+                remaining -= hits
+
+        prev = parent
+
+    return changed
+
+
+def build_key_history(file_path, keys_of_interest, cache=None, rev_range=None):
     """
     Return dict: {key: last_change_datetime} for the given set of keys.
 
-    Walks the git log for file_path. For each commit, compares the ARB snapshot
-    to its parent. When a key's value changes, records the commit's timestamp
-    as that key's last-change date (git log is newest-first, so first match wins).
+    Walks the git log for file_path. For each commit, diffs the ARB snapshot's
+    per-key hashes against its parent's. When a key's value changes, records
+    the commit's timestamp as that key's last-change date (git log is
+    newest-first, so first match wins). All snapshots are streamed through a
+    single `git cat-file --batch` process.
+
+    When a cache dict (see load_history_cache) is passed, only commits newer
+    than the cached head are walked and the cache entry is updated in place.
+
+    rev_range limits the walk: "B" walks history reachable from B, "A..B" only
+    the commits in that range (diffing the oldest against the snapshot at A).
+    The cache is not consulted for ranged walks.
     """
-    commits = get_commit_log(file_path)
+    if cache is not None and rev_range is None:
+        entries = update_cached_history(file_path, cache)
+        return {key: datetime.fromisoformat(entries[key][1])
+                for key in keys_of_interest if key in entries}
+
+    commits = get_commit_log(file_path, rev_range)
     if not commits:
         return {}
 
-    key_last_changed = {}
-    remaining = set(keys_of_interest)
+    with GitBlobReader() as reader:
+        base_data = None
+        if rev_range and ".." in rev_range:
+            base_rev = rev_range.split("..", 1)[0]
+            base_data = next(iter_arb_revisions(reader, file_path, [(base_rev, None)]))
+        changed = _walk_history(reader, file_path, commits, keys_of_interest, base_data)
+    return {key: commit_dt for key, (_, commit_dt) in changed.items()}
+
+
+# ── history cache ─────────────────────────────────────────────────────────────
+#
+# .oxbar/cache/harbor-history.json:
+#   {"version": 1,
+#    "files": {"lib/l10n/app_en.arb": {
+#        "head": "<newest commit covered>",
+#        "keys": {key: [commit, iso_timestamp, value_hash_at_head | null]}}}}
+#
+# Every key that ever changed in the file is recorded (value_hash is null once
+# the key is gone at head), so cached results match a full walk for any set
+# of keys of interest.
+
+def value_hash(value):
+    """Short stable digest of an ARB value."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def load_history_cache(path=CACHE_PATH):
+    """Return the cache dict, or an empty one if missing, corrupt or outdated."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION and isinstance(cache.get("files"), dict):
+            return cache
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        pass
+    return {"version": CACHE_VERSION, "files": {}}
+
 
-    # Seed: current state
-    prev_data = get_arb_at_commit(commits[0][0], file_path)
+def save_history_cache(cache, path=CACHE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
 
-    for i, (commit_hash, commit_dt) in enumerate(commits):
-        if not remaining:
-            break
 
-        if i == len(commits) - 1:
-            # Oldest commit — everything present here was "added" then.
-            parent_data = {}
+def update_cached_history(file_path, cache):
+    """
+    Bring the cache entry for file_path up to date and return its "keys".
+
+    Walks only commits after the cached head. Falls back to a full rebuild when
+    there is no entry, the cached head is no longer an ancestor of HEAD
+    (rewritten history), or the cached value hashes disagree with the blob at
+    the cached head.
+    """
+    name = Path(file_path).as_posix()
+    entry = cache["files"].get(name)
+    commits = get_commit_log(file_path)
+    if not commits:
+        cache["files"].pop(name, None)
+        return {}
+    new_head = commits[0][0]
+
+    with GitBlobReader() as reader:
+        if entry and entry.get("head") == new_head:
+            return entry["keys"]
+
+        if entry and is_ancestor(entry.get("head", "")):
+            base_data = next(iter_arb_revisions(reader, file_path, [(entry["head"], None)]))
+            cached = entry["keys"]
+            # Null values are never recorded (see snapshot_hashes), so they
+            # are left out of both sides of the comparison.
+            consistent = (
+                sum(1 for record in cached.values() if record[2] is not None)
+                == sum(value is not None for value in base_data.values())
+                and all(cached.get(key, (None, None, None))[2] == value_hash(value)
+                        for key, value in base_data.items() if value is not None)
+            )
+            if consistent:
+                new_commits = get_commit_log(file_path, f"{entry['head']}..HEAD")
+                changed = _walk_history(reader, file_path, new_commits, None, base_data)
+                keys = dict(cached)
+            else:
+                entry = None
         else:
-            parent_data = get_arb_at_commit(commits[i + 1][0], file_path)
+            entry = None
+
+        if entry is None:
+            changed = _walk_history(reader, file_path, commits, None)
+            keys = {}
+
+        head_data = next(iter_arb_revisions(reader, file_path, commits[:1]))
+
+    for key, (commit_hash, commit_dt) in changed.items():
+        keys[key] = [commit_hash, commit_dt.isoformat(), None]
+    for key, record in keys.items():
+        record[2] = value_hash(head_data[key]) if key in head_data else None
+
+    cache["files"][name] = {"head": new_head, "keys": keys}
+    return keys
 
-        for key in list(remaining):
-            current_val = prev_data.get(key)
-            parent_val = parent_data.get(key)
-            if current_val != parent_val:
-                key_last_changed[key] = commit_dt
-                remaining.discard(key)
 
-        prev_data = parent_data
+# ── parallel history ──────────────────────────────────────────────────────────
 
-    return key_last_changed
+def _history_job(file_path, keys_of_interest, cache_files, rev_range=None):
+    """Process-pool entry point: one file's history against its cache slice."""
+    if cache_files is None:
+        return build_key_history(file_path, keys_of_interest, None, rev_range), None
+    cache = {"version": CACHE_VERSION, "files": cache_files}
+    history = build_key_history(file_path, keys_of_interest, cache, rev_range)
+    return history, cache["files"]
+
+
+def build_histories(targets, cache, jobs=None):
+    """
+    Build key histories for several ARB files concurrently.
+
+    targets: {name: (file_path, keys_of_interest, rev_range)}. Each file is
+    walked in its own worker process with its own slice of the cache; the
+    updated slices are merged back into cache (which may be None to skip
+    caching). Returns {name: {key: last_change_datetime}}.
+    """
+    def cache_slice(file_path):
+        if cache is None:
+            return None
+        name = Path(file_path).as_posix()
+        return {name: cache["files"][name]} if name in cache["files"] else {}
+
+    results = {}
+    if jobs == 1 or len(targets) <= 1:
+        for name, (file_path, keys, rev_range) in targets.items():
+            results[name] = _history_job(file_path, keys, cache_slice(file_path), rev_range)
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1,
+                                                 len(targets))) as pool:
+            futures = {
+                name: pool.submit(_history_job, file_path, keys,
+                                  cache_slice(file_path), rev_range)
+                for name, (file_path, keys, rev_range) in targets.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+    histories = {}
+    for name, (file_path, _, _) in targets.items():
+        history, files = results[name]
+        if cache is not None:
+            cache["files"].pop(Path(file_path).as_posix(), None)
+            cache["files"].update(files)
+        histories[name] = history
+    return histories
 
 
 # ── ARB loading ───────────────────────────────────────────────────────────────
@@ -132,18 +485,163 @@ def load_arb(path):
         sys.exit(1)
 
 
+def discover_locales(l10n_dir=L10N_DIR):
+    """Return {locale: arb_path} for every target locale, sorted by code.
+
+    Locales come from lib/l10n/app_<locale>.arb plus REQUIRED_LOCALES; the
+    source locale (EN) is excluded.
+    """
+    found = {path.stem[len("app_"):]: path for path in Path(l10n_dir).glob("app_*.arb")}
+    for locale in REQUIRED_LOCALES:
+        found.setdefault(locale, Path(l10n_dir) / f"app_{locale}.arb")
+    found.pop(SOURCE_LOCALE, None)
+    return dict(sorted(found.items()))
+
+
+def locale_label(locale):
+    return LOCALE_NAMES.get(locale, locale.upper())
+
+
+def locale_owner(locale):
+    return f"POLYGLOT-{locale.upper()}"
+
+
+def human_join(items):
+    """"a", "a and b", "a, b and c"."""
+    items = list(items)
+    if len(items) < 2:
+        return "".join(items)
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+
+def load_l10n():
+    """
+    Parse app_en.arb and every target locale exactly once.
+
+    Returns (en_data, locales, locale_data): en_data is None when app_en.arb is
+    missing, locales is discover_locales(), and locale_data maps each locale
+    to its parsed keys (None when that ARB file is missing).
+    """
+    en_data = load_arb(ARB_EN)
+    locales = discover_locales()
+    locale_data = {loc: load_arb(path) for loc, path in locales.items()}
+    return en_data, locales, locale_data
+
+
+def locale_key_sets(locale_data):
+    """{locale: set(keys)} — empty for locales whose ARB file is missing."""
+    return {loc: set(data) if data is not None else set()
+            for loc, data in locale_data.items()}
+
+
+# ── freshness ─────────────────────────────────────────────────────────────────
+
+def check_freshness(en_keys, locale_keys, locales, threshold_days, jobs=None,
+                    use_cache=True, since=None, rev_range=None):
+    """
+    Date EN and translation changes and collect stale/missing keys.
+
+    Returns {"stale": {locale: [(key, en_date, tr_date)]},
+             "missing": {locale: [key]}, "scope": str | None,
+             "checked": int}.
+    With since / rev_range only the EN keys changed in that range are checked
+    (PR mode), and en_keys / locale_keys are replaced by the key sets at the
+    end of the range; otherwise every EN key is, using the history cache.
+    """
+    scope = None
+    if since or rev_range:
+        # PR mode: only EN keys whose value differs between the range ends.
+        with timed("scope"):
+            base_rev, head_rev = resolve_rev_range(since, rev_range)
+            with GitBlobReader() as reader:
+                def at_head(path):
+                    return next(iter_arb_revisions(reader, path, [(head_rev, None)]))
+
+                base_en = next(iter_arb_revisions(reader, ARB_EN, [(base_rev, None)]))
+                head_en = at_head(ARB_EN)
+                # Keys as of the end of the range, not the working tree.
+                en_keys = set(head_en)
+                locale_keys = {loc: set(at_head(locales[loc])) for loc in locale_keys}
+            checked_keys = changed_keys(snapshot_hashes(head_en),
+                                        snapshot_hashes(base_en)) & en_keys
+        en_range = f"{base_rev}..{head_rev}"
+        scope = (f"{len(checked_keys)} EN key(s) changed in "
+                 f"{base_rev[:12]}..{head_rev}")
+        print(f"HARBOR PR mode — {scope}.")
+    else:
+        checked_keys = en_keys
+        en_range = head_rev = None
+
+    # Keys in EN but absent from target — flag as missing.
+    missing = {loc: list(checked_keys - keys) for loc, keys in locale_keys.items()}
+
+    print(f"Building key history for {len(checked_keys)} EN keys "
+          f"and {len(locales)} locale(s) ({', '.join(locales)}) …")
+
+    # EN and every locale are walked concurrently; the EN history is shared
+    # by all locale comparisons. Keys present in both EN and the target
+    # locale are the ones checked for staleness.
+    targets = {SOURCE_LOCALE: (ARB_EN, checked_keys, en_range)}
+    targets.update({
+        loc: (locales[loc], checked_keys & keys, head_rev)
+        for loc, keys in locale_keys.items() if keys
+    })
+    with timed("history"):
+        if not checked_keys:
+            histories = {name: {} for name in targets}
+        elif scope is not None:
+            histories = build_histories(targets, None, jobs)
+        else:
+            cache = load_history_cache() if use_cache else {"version": CACHE_VERSION, "files": {}}
+            histories = build_histories(targets, cache, jobs)
+            save_history_cache(cache)
+    en_history = histories[SOURCE_LOCALE]
+
+    stale = {loc: [] for loc in locales}
+
+    with timed("compare"):
+        for key in checked_keys:
+            en_date = en_history.get(key)
+            if en_date is None:
+                # Key has no git history (perhaps arb was bulk-added with no prior state)
+                continue
+
+            for loc, keys in locale_keys.items():
+                if key in keys:
+                    tr_date = histories[loc].get(key)
+                    if tr_date is None or (en_date - tr_date).days > threshold_days:
+                        stale[loc].append((key, en_date, tr_date))
+
+    return {"stale": stale, "missing": missing, "scope": scope,
+            "checked": len(checked_keys)}
+
+
 # ── report ────────────────────────────────────────────────────────────────────
 
-def write_report(stale_ar, stale_ku, missing_ar, missing_ku, threshold_days, en_data):
+def write_report(stale, missing, threshold_days, en_data, scope=None):
+    """
+    Write the markdown report and return the total issue count.
+
+    stale:   {locale: [(key, en_date, translation_date), ...]}
+    missing: {locale: [key, ...]}
+    scope:   optional description of a partial check (PR mode)
+    """
     REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    total_stale = len(stale_ar) + len(stale_ku) + len(missing_ar) + len(missing_ku)
+    locales = sorted(stale.keys() | missing.keys())
+    total_stale = (sum(len(v) for v in stale.values())
+                   + sum(len(v) for v in missing.values()))
+    owners = human_join([locale_owner(loc) for loc in locales])
 
     lines = [
         f"# HARBOR — Translation Freshness Report",
         f"",
         f"**Generated:** {now}  ",
         f"**Staleness threshold:** {threshold_days} days  ",
+    ]
+    if scope:
+        lines += [f"**Scope:** {scope}  "]
+    lines += [
         f"**Total issues:** {total_stale}",
         f"",
     ]
@@ -152,23 +650,31 @@ def write_report(stale_ar, stale_ku, missing_ar, missing_ku, threshold_days, en_
         lines += [
             "## ✅ All translations are fresh",
             "",
-            "No keys require re-translation. Good work, POLYGLOT-AR and POLYGLOT-KU.",
+            f"No keys require re-translation. Good work, {owners}.",
         ]
     else:
+        code = {loc: loc.upper() for loc in locales}
         lines += [
             "## Summary",
             "",
             f"| Issue type                   | Count |",
             f"|------------------------------|-------|",
-            f"| AR stale (EN changed, AR old)| {len(stale_ar):5} |",
-            f"| KU stale (EN changed, KU old)| {len(stale_ku):5} |",
-            f"| Missing in AR                | {len(missing_ar):5} |",
-            f"| Missing in KU                | {len(missing_ku):5} |",
-            f"",
-            f"**Owner for AR issues:** POLYGLOT-AR  ",
-            f"**Owner for KU issues:** POLYGLOT-KU",
-            f"",
         ]
+        lines += [
+            f"| {f'{code[loc]} stale (EN changed, {code[loc]} old)':29}| {len(stale.get(loc, [])):5} |"
+            for loc in locales
+        ]
+        lines += [
+            f"| {f'Missing in {code[loc]}':29}| {len(missing.get(loc, [])):5} |"
+            for loc in locales
+        ]
+        lines += [f""]
+        lines += [
+            f"**Owner for {code[loc]} issues:** {locale_owner(loc)}"
+            + ("  " if loc != locales[-1] else "")
+            for loc in locales
+        ]
+        lines += [f""]
 
         def key_table(entries, label):
             if not entries:
@@ -194,16 +700,19 @@ def write_report(stale_ar, stale_ku, missing_ar, missing_ku, threshold_days, en_
                 out.append(f"| `{key}` | {en_val} |")
             return out + [""]
 
-        lines += key_table(stale_ar,  "⚠️ Arabic — stale (EN changed, AR not updated)")
-        lines += key_table(stale_ku,  "⚠️ Kurdish-Sorani — stale (EN changed, KU not updated)")
-        lines += missing_table(missing_ar, "❌ Arabic — key missing entirely")
-        lines += missing_table(missing_ku, "❌ Kurdish-Sorani — key missing entirely")
+        for loc in locales:
+            lines += key_table(stale.get(loc, []),
+                               f"⚠️ {locale_label(loc)} — stale "
+                               f"(EN changed, {code[loc]} not updated)")
+        for loc in locales:
+            lines += missing_table(missing.get(loc, []),
+                                   f"❌ {locale_label(loc)} — key missing entirely")
 
         lines += [
             "---",
             "",
             "_This report is generated weekly by HARBOR. "
-            "POLYGLOT-AR and POLYGLOT-KU should address stale translations within 7 days of this report._",
+            f"{owners} should address stale translations within 7 days of this report._",
         ]
 
     REPORT_PATH.write_text("\n".join(lines), encoding="utf-8")
@@ -213,17 +722,30 @@ def write_report(stale_ar, stale_ku, missing_ar, missing_ku, threshold_days, en_
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="HARBOR translation freshness check")
     parser.add_argument("--days", type=int, default=30,
                         help="Staleness threshold in days (default: 30)")
     parser.add_argument("--repo", type=str, default=".",
                         help="Path to git repo root (default: current directory)")
-    args = parser.parse_args()
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild key history from scratch instead of using "
+                             f"{CACHE_PATH}")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes for history building "
+                             "(default: CPU count; 1 disables the pool)")
+    scope_group = parser.add_mutually_exclusive_group()
+    scope_group.add_argument("--since", metavar="REV",
+                             help="Only check EN keys changed since REV (PR mode)")
+    scope_group.add_argument("--range", metavar="A..B", dest="rev_range",
+                             help="Only check EN keys changed in the range A..B")
+    args = parser.parse_args(argv)
 
     os.chdir(args.repo)
+    PHASE_TIMINGS.clear()
 
-    en_data = load_arb(ARB_EN)
+    with timed("load"):
+        en_data, locales, locale_data = load_l10n()
     if en_data is None:
         print(
             "HARBOR: app_en.arb not found. "
@@ -233,50 +755,14 @@ def main():
         )
         sys.exit(2)
 
-    ar_data = load_arb(ARB_AR)
-    ku_data = load_arb(ARB_KU)
-
-    en_keys   = set(en_data)
-    ar_keys   = set(ar_data) if ar_data is not None else set()
-    ku_keys   = set(ku_data) if ku_data is not None else set()
-
-    # Keys present in both EN and the target locale — check staleness.
-    ar_shared = en_keys & ar_keys
-    ku_shared = en_keys & ku_keys
-    # Keys in EN but absent from target — flag as missing.
-    missing_ar = list(en_keys - ar_keys)
-    missing_ku = list(en_keys - ku_keys)
-
-    all_tracked = en_keys | ar_keys | ku_keys
-    print(f"Building key history for {len(en_keys)} EN keys …")
-
-    en_history = build_key_history(ARB_EN, en_keys)
-    ar_history = build_key_history(ARB_AR, ar_shared) if ar_data is not None else {}
-    ku_history = build_key_history(ARB_KU, ku_shared) if ku_data is not None else {}
-
-    threshold_days = args.days
-    stale_ar = []
-    stale_ku = []
-
-    for key in en_keys:
-        en_date = en_history.get(key)
-        if en_date is None:
-            # Key has no git history (perhaps arb was bulk-added with no prior state)
-            continue
-
-        # Arabic staleness
-        if key in ar_keys:
-            ar_date = ar_history.get(key)
-            if ar_date is None or (en_date - ar_date).days > threshold_days:
-                stale_ar.append((key, en_date, ar_date))
-
-        # Kurdish-Sorani staleness
-        if key in ku_keys:
-            ku_date = ku_history.get(key)
-            if ku_date is None or (en_date - ku_date).days > threshold_days:
-                stale_ku.append((key, en_date, ku_date))
-
-    total = write_report(stale_ar, stale_ku, missing_ar, missing_ku, threshold_days, en_data)
+    result = check_freshness(
+        set(en_data), locale_key_sets(locale_data), locales, args.days,
+        jobs=args.jobs, use_cache=not args.no_cache,
+        since=args.since, rev_range=args.rev_range,
+    )
+    with timed("report"):
+        total = write_report(result["stale"], result["missing"], args.days,
+                             en_data, result["scope"])
 
     if total > 0:
         print(
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+HARBOR — glossary term consistency.
+
+lib/l10n/glossary.json lists fitness terms with their EN/AR/KU renderings.
+For every EN value that uses a glossary term, the translated value in each
+locale must contain that term's rendering for the locale.
+
+One Aho-Corasick automaton is built from the EN terms and one per locale from
+the renderings, so every ARB value is scanned exactly once regardless of how
+many terms the glossary holds: the check is linear in total text size.
+
+Run through scripts/harbor.py (`harbor.py glossary`).
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+
+
+GLOSSARY_PATH = Path("lib/l10n/glossary.json")
+
+# Arabic-script marks that don't change a word's identity: harakat, superscript
+# alef and tatweel. Stripped from both values and renderings before matching.
+_IGNORED_MARKS = dict.fromkeys(
+    [*range(0x064B, 0x0653), 0x0670, 0x0640], None
+)
+
+
+def normalize(text):
+    return text.lower().translate(_IGNORED_MARKS)
+
+
+class TermAutomaton:
+    """Aho-Corasick automaton over a fixed set of (term_id, text) pairs."""
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for term_id, text in terms:
+            if not text:
+                continue
+            node = 0
+            for ch in text:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._out[node].append((term_id, len(text)))
+
+        # Breadth-first fail links; each node inherits its fail node's outputs.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, term_id) for every occurrence, overlaps included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for term_id, length in out[node]:
+                yield i - length + 1, i + 1, term_id
+
+    def term_ids(self, text):
+        """Set of term ids occurring anywhere in text."""
+        return {term_id for _, _, term_id in self.iter_matches(text)}
+
+
+def _is_word_at(text, start, end):
+    """True if text[start:end] is a whole word (a plural "s"/"es" is allowed)."""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    rest = text[end:end + 3]
+    for suffix in ("", "s", "es"):
+        if rest.startswith(suffix):
+            after = end + len(suffix)
+            if after >= len(text) or not text[after].isalnum():
+                return True
+    return False
+
+
+def en_terms_in(automaton, text):
+    """
+    Glossary term ids used as whole words in text, leftmost-longest.
+
+    "push-up test" wins over the "push-up" inside it.
+    """
+    matches = sorted(
+        (m for m in automaton.iter_matches(text) if _is_word_at(text, m[0], m[1])),
+        key=lambda m: (m[0], -m[1]),
+    )
+    found, covered_to = set(), 0
+    for start, end, term_id in matches:
+        if start >= covered_to:
+            found.add(term_id)
+            covered_to = end
+    return found
+
+
+def load_glossary(path=GLOSSARY_PATH):
+    """Return the glossary's term list, or None if the file is missing."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [t for t in json.load(f).get("terms", []) if t.get("id") and t.get("en")]
+    except FileNotFoundError:
+        return None
+
+
+def check_glossary(terms, en_data, locale_data):
+    """
+    Return {"ok", "violations": {locale: [(key, term_id, expected)]}}.
+
+    A violation is an EN value using a glossary term whose translation does
+    not contain the term's rendering for that locale. Locales without a
+    rendering for a term, and keys absent from a locale, are skipped.
+    """
+    by_id = {t["id"]: t for t in terms}
+    en_automaton = TermAutomaton((t["id"], normalize(t["en"])) for t in terms)
+    en_terms = {}
+    for key, value in en_data.items():
+        if isinstance(value, str):
+            used = en_terms_in(en_automaton, normalize(value))
+            if used:
+                en_terms[key] = used
+
+    violations = {}
+    for loc, data in locale_data.items():
+        violations[loc] = []
+        if not data:
+            continue
+        automaton = TermAutomaton(
+            (t["id"], normalize(t[loc])) for t in terms if t.get(loc)
+        )
+        for key, used in en_terms.items():
+            value = data.get(key)
+            if not isinstance(value, str):
+                continue
+            expected = {term_id for term_id in used if by_id[term_id].get(loc)}
+            if not expected:
+                continue
+            for term_id in sorted(expected - automaton.term_ids(normalize(value))):
+                violations[loc].append((key, term_id, by_id[term_id][loc]))
+
+    return {"ok": not any(violations.values()), "violations": violations}
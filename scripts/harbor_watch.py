@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+HARBOR — watch mode for translators.
+
+Keeps every parsed ARB, its per-key hashes and the key history in memory and
+polls lib/l10n for changes. When a file changes only that locale is re-parsed
+and diffed against its previous snapshot; parity (missing keys) and freshness
+(stale keys) are re-evaluated for the changed keys alone.
+
+Uncommitted edits count as changed "now": editing an EN value makes its
+translations stale until they are edited too. When HEAD moves, the key
+history is brought up to date through the incremental history cache.
+
+Run through scripts/harbor.py (`harbor.py --watch`).
+"""
+
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from harbor_freshness_check import (
+    ARB_EN,
+    CACHE_VERSION,
+    L10N_DIR,
+    SOURCE_LOCALE,
+    GitBlobReader,
+    build_histories,
+    changed_keys,
+    discover_locales,
+    iter_arb_revisions,
+    load_history_cache,
+    save_history_cache,
+    snapshot_hashes,
+)
+
+
+# Keys listed per locale when missing/stale sets change.
+MAX_LISTED = 10
+
+
+def _read_arb(path):
+    """Return (data, error): data is None when the file is missing."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: v for k, v in data.items()
+                if not k.startswith("@") and k != "@@locale"}, None
+    except FileNotFoundError:
+        return None, None
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError) as e:
+        return None, e
+
+
+def _mtime(path):
+    try:
+        stat = Path(path).stat()
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+class HarborWatch:
+    """In-memory parity/freshness state, updated one changed file at a time."""
+
+    def __init__(self, threshold_days, use_cache=True, jobs=None):
+        self.threshold_days = threshold_days
+        self.jobs = jobs
+        self.cache = (load_history_cache() if use_cache
+                      else {"version": CACHE_VERSION, "files": {}})
+        self.paths = {}        # locale -> ARB path ("en" included)
+        self.data = {}         # locale -> parsed keys, or None if file missing
+        self.hashes = {}       # locale -> snapshot_hashes() of the working tree
+        self.stamps = {}       # locale -> (mtime_ns, size) or None
+        self.head = None
+        self.head_hashes = {}  # locale -> snapshot_hashes() at HEAD
+        self.histories = {}    # locale -> {key: last_change_datetime}
+        self.dirty = {}        # locale -> keys whose value differs from HEAD
+        self.missing = {}      # target locale -> set of EN keys absent there
+        self.stale = {}        # target locale -> set of stale keys
+
+    # ── state ────────────────────────────────────────────────────────────────
+
+    @property
+    def targets(self):
+        return [loc for loc in self.paths if loc != SOURCE_LOCALE]
+
+    def _keys(self, loc):
+        return self.hashes.get(loc, {})
+
+    def _evaluate(self, keys, locales):
+        """Recompute missing/stale membership of keys for the given locales."""
+        now = datetime.now(timezone.utc)
+        en = self._keys(SOURCE_LOCALE)
+        en_history = self.histories.get(SOURCE_LOCALE, {})
+        en_dirty = self.dirty.get(SOURCE_LOCALE, set())
+        for loc in locales:
+            missing = self.missing.setdefault(loc, set())
+            stale = self.stale.setdefault(loc, set())
+            tr = self._keys(loc)
+            history = self.histories.get(loc, {})
+            tr_dirty = self.dirty.get(loc, set())
+            for key in keys:
+                missing.discard(key)
+                stale.discard(key)
+                if key not in en:
+                    continue
+                if key not in tr:
+                    missing.add(key)
+                    continue
+                en_date = now if key in en_dirty else en_history.get(key)
+                if en_date is None:
+                    continue
+                tr_date = now if key in tr_dirty else history.get(key)
+                if tr_date is None or (en_date - tr_date).days > self.threshold_days:
+                    stale.add(key)
+
+    def _all_keys(self):
+        keys = set(self._keys(SOURCE_LOCALE))
+        for loc in self.targets:
+            keys |= self.missing.get(loc, set()) | self.stale.get(loc, set())
+        return keys
+
+    def sync_head(self):
+        """Re-date key history if HEAD moved. Returns True when it did."""
+        head = subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True, text=True).stdout.strip()
+        if head == self.head:
+            return False
+        self.head = head
+
+        targets = {loc: (path, set(self._keys(loc)), None)
+                   for loc, path in self.paths.items() if self._keys(loc)}
+        self.histories = build_histories(targets, self.cache, self.jobs)
+        save_history_cache(self.cache)
+
+        with GitBlobReader() as reader:
+            for loc, path in self.paths.items():
+                self.head_hashes[loc] = snapshot_hashes(
+                    next(iter_arb_revisions(reader, path, [("HEAD", None)]))
+                )
+        for loc in self.paths:
+            self.dirty[loc] = changed_keys(self._keys(loc), self.head_hashes[loc])
+        self._evaluate(self._all_keys(), self.targets)
+        return True
+
+    def load_file(self, loc, path):
+        """
+        Re-parse one locale and update state for the keys it changed.
+
+        Returns the changed key set, or None if the file is mid-edit (invalid
+        JSON) and the previous snapshot was kept. The path is recorded either
+        way (poll() has already stored its mtime), so an invalid new file is
+        reported once per edit rather than on every poll.
+        """
+        self.paths[loc] = Path(path)
+        data, error = _read_arb(path)
+        if error is not None:
+            print(f"  {Path(path).name}: not valid JSON yet ({error}) — keeping last snapshot")
+            return None
+
+        first = loc not in self.data
+        self.data[loc] = data
+        old = self.hashes.get(loc, {})
+        new = snapshot_hashes(data or {})
+        self.hashes[loc] = new
+        changed = changed_keys(new, old)
+
+        head = self.head_hashes.get(loc, {})
+        dirty = self.dirty.setdefault(loc, set())
+        for key in changed:
+            if new.get(key) != head.get(key):
+                dirty.add(key)
+            else:
+                dirty.discard(key)
+
+        if loc == SOURCE_LOCALE:
+            self._evaluate(changed, self.targets)
+        elif first:
+            # A locale seen for the first time: every EN key may be missing.
+            self._evaluate(changed | set(self._keys(SOURCE_LOCALE)), [loc])
+        else:
+            self._evaluate(changed, [loc])
+        return changed
+
+    def load_all(self):
+        self.paths = {SOURCE_LOCALE: ARB_EN, **discover_locales()}
+        for loc, path in self.paths.items():
+            self.stamps[loc] = _mtime(path)
+            self.load_file(loc, path)
+
+    def poll(self):
+        """Return [(locale, changed_keys)] for files edited since last poll."""
+        updates = []
+        current = {SOURCE_LOCALE: ARB_EN, **discover_locales()}
+        for loc, path in current.items():
+            stamp = _mtime(path)
+            if loc in self.paths and stamp == self.stamps.get(loc):
+                continue
+            self.stamps[loc] = stamp
+            if loc not in self.paths:
+                self.head_hashes[loc] = {}
+            changed = self.load_file(loc, path)
+            if changed:
+                updates.append((loc, changed))
+        return updates
+
+    # ── output ───────────────────────────────────────────────────────────────
+
+    def summary(self):
+        parts = []
+        for loc in self.targets:
+            parts.append(f"{loc.upper()} missing {len(self.missing.get(loc, ()))}, "
+                         f"stale {len(self.stale.get(loc, ()))}")
+        return "; ".join(parts)
+
+    def snapshot_sets(self):
+        return ({loc: set(keys) for loc, keys in self.missing.items()},
+                {loc: set(keys) for loc, keys in self.stale.items()})
+
+
+def _describe(label, before, after):
+    lines = []
+    for loc in sorted(after.keys() | before.keys()):
+        added = sorted(after.get(loc, set()) - before.get(loc, set()))
+        resolved = sorted(before.get(loc, set()) - after.get(loc, set()))
+        for sign, keys in (("+", added), ("-", resolved)):
+            if keys:
+                shown = ", ".join(keys[:MAX_LISTED])
+                more = f" … +{len(keys) - MAX_LISTED}" if len(keys) > MAX_LISTED else ""
+                lines.append(f"  {sign} {label} {loc.upper()}: {shown}{more}")
+    return lines
+
+
+def run_watch(threshold_days, interval=0.5, use_cache=True, jobs=None):
+    """Poll lib/l10n until interrupted, printing parity/freshness deltas."""
+    started = time.perf_counter()
+    watch = HarborWatch(threshold_days, use_cache=use_cache, jobs=jobs)
+    watch.load_all()
+    watch.sync_head()
+    print(f"HARBOR watching {L10N_DIR}/ "
+          f"({len(watch.paths)} ARB files, {len(watch._keys(SOURCE_LOCALE))} EN keys) "
+          f"— ready in {time.perf_counter() - started:.2f}s. Ctrl-C to stop.")
+    print(f"  {watch.summary()}")
+
+    try:
+        while True:
+            time.sleep(interval)
+            before = watch.snapshot_sets()
+            t0 = time.perf_counter()
+            moved = watch.sync_head()
+            updates = watch.poll()
+            if not moved and not updates:
+                continue
+            elapsed = time.perf_counter() - t0
+            stamp = datetime.now().strftime("%H:%M:%S")
+            what = [f"{watch.paths[loc].name} ({len(keys)} key(s))" for loc, keys in updates]
+            if moved:
+                what.insert(0, f"HEAD → {watch.head[:12]}")
+            print(f"[{stamp}] {', '.join(what)} — {watch.summary()} ({elapsed * 1000:.0f} ms)")
+            after = watch.snapshot_sets()
+            for line in (_describe("missing", before[0], after[0])
+                         + _describe("stale", before[1], after[1])):
+                print(line)
+    except KeyboardInterrupt:
+        print("\nHARBOR watch stopped.")
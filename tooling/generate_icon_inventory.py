@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""Build the icon inventory from the Dart sources instead of the markdown table.
+
+Every .dart file under lib/ is scanned (across a process pool) for Icons.*,
+CupertinoIcons.* and asset icon paths ('assets/icons/...'), plus the custom
+icon widgets named in ICON_INVENTORY.md (e.g. HalfPillIcon). The result uses
+the ICON_INVENTORY.json schema: id, type, current, files, context,
+description, feature_group.
+
+Every markdown row is kept, by id, with its type, feature_group, context and
+description. A row gets only the usages in the files it lists (the one
+whose line ranges contain the usage, when several rows list the file); a
+"Multiple files" row lists none. The remaining usages of an icon the
+markdown knows go to one "<id>_unassigned" entry per icon name, to be
+sorted into rows by hand. Icons the markdown does not know get an id
+derived from the name (material_home_outlined, asset_icon_pill). Both get a
+feature group derived from their directories.
+
+Scan results are cached per file in .oxbar/cache/icon-index.json. A file is
+re-read only if its mtime or size changed, and re-scanned only if its
+content hash changed too, so re-runs after small edits touch only the
+edited files.
+
+The result goes to docs/ICON_INVENTORY.generated.json (.ndjson with
+--ndjson) for review; --write replaces docs/ICON_INVENTORY.json instead.
+
+Usage:
+    python3 tooling/generate_icon_inventory.py [--root DIR] [--markdown PATH]
+                                               [--no-markdown]
+                                               [--output PATH | --write]
+                                               [--ndjson] [--expanded-lines]
+                                               [--no-cache] [--jobs N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from parse_icon_inventory import (
+    DEFAULT_INPUT,
+    DEFAULT_OUTPUT,
+    expand_ranges,
+    icon_names,
+    merge_ranges,
+    parse_markdown_to_json,
+    write_json_array,
+    write_ndjson,
+)
+
+SOURCE_DIR = 'lib'
+GENERATED_OUTPUT = DEFAULT_OUTPUT[:-len('.json')] + '.generated.json'
+UNASSIGNED_CONTEXT = 'Unassigned: no ICON_INVENTORY.md row lists these files'
+CACHE_PATH = '.oxbar/cache/icon-index.json'
+# Bump when the scanner's matching rules change; invalidates cached results.
+SCANNER_VERSION = 1
+
+ICON_REF = re.compile(rb'(?<![\w.])(?:CupertinoIcons|Icons)\.\w+')
+ASSET_REF = re.compile(rb'''['"](assets/icons/[^'"\s]+)['"]''')
+IDENTIFIER = re.compile(r'^[A-Za-z_]\w*$')
+
+# lib/<screens|widgets|components>/<dir>/... -> inventory feature group.
+DIR_GROUPS = {
+    'nav': 'Navigation', 'navigation': 'Navigation', 'menu': 'Navigation',
+    'workout': 'Workout', 'plans': 'Workout', 'fatigue': 'Workout',
+    'nutrition': 'Nutrition', 'supplements': 'Nutrition', 'hydration': 'Nutrition',
+    'messaging': 'Messaging', 'calling': 'Messaging',
+    'calendar': 'Calendar',
+    'progress': 'Metrics/Progress', 'analytics': 'Metrics/Progress',
+    'streaks': 'Metrics/Progress', 'rank': 'Metrics/Progress',
+    'admin': 'Admin',
+    'settings': 'Settings/Profile', 'coach_profile': 'Settings/Profile',
+    'files': 'Files/Media', 'reel': 'Files/Media',
+    'music': 'Music/Audio',
+    'ocr': 'Camera/Photo',
+}
+DEFAULT_GROUP = 'Other'
+
+
+# ── scanning ────────────────────────────────────────────────────────────────
+
+def icon_type(name):
+    if name.startswith('Icons.'):
+        return 'material'
+    if name.startswith('CupertinoIcons.'):
+        return 'cupertino'
+    if name.startswith('assets/'):
+        return 'asset'
+    return 'custom'
+
+
+@lru_cache(maxsize=None)
+def _custom_pattern(custom_names):
+    if not custom_names:
+        return None
+    alternation = b'|'.join(re.escape(n.encode('utf-8'))
+                            for n in sorted(custom_names, key=len, reverse=True))
+    return re.compile(rb'(?<![\w.])(?:' + alternation + rb')(?!\w)')
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def scan_source(job):
+    """Worker: return (path, hash, {name: [line, ...]}) for one Dart file.
+
+    job is (root, path, cached_hash, custom_names). refs is None when the
+    content hash equals cached_hash, i.e. the cached result still applies.
+    """
+    root, path, cached_hash, custom_names = job
+    with open(os.path.join(root, path), 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    if digest == cached_hash:
+        return path, digest, None
+
+    newlines = [m.start() for m in re.finditer(rb'\n', data)]
+    refs = defaultdict(list)
+
+    def add(name, pos):
+        refs[name.decode('utf-8')].append(bisect_right(newlines, pos - 1) + 1)
+
+    for m in ICON_REF.finditer(data):
+        add(m.group(), m.start())
+    for m in ASSET_REF.finditer(data):
+        add(m.group(1), m.start(1))
+    custom = _custom_pattern(custom_names)
+    if custom is not None:
+        for m in custom.finditer(data):
+            add(m.group(), m.start())
+    return path, digest, dict(refs)
+
+
+def iter_dart_files(root, source_dir=SOURCE_DIR):
+    """Yield repository-relative paths of all .dart files, "/"-separated."""
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, source_dir)):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.dart'):
+                full = os.path.join(dirpath, name)
+                yield os.path.relpath(full, root).replace(os.sep, '/')
+
+
+def load_cache(path, signature):
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get('signature') != signature:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(path, signature, files):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'signature': signature, 'files': files}, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def scan_tree(root='.', custom_names=(), cache_path=CACHE_PATH, jobs=None):
+    """Return ({path: {name: [line, ...]}}, stats) for every Dart file.
+
+    stats counts files reused from the cache by stat, by content hash, and
+    actually scanned.
+    """
+    custom_names = tuple(sorted(custom_names))
+    signature = {'version': SCANNER_VERSION, 'custom': list(custom_names)}
+    cached = load_cache(cache_path, signature) if cache_path else {}
+
+    files, stamps, file_jobs = {}, {}, []
+    stats = {'files': 0, 'unchanged': 0, 'same_content': 0, 'scanned': 0}
+    for path in iter_dart_files(root):
+        stats['files'] += 1
+        st = os.stat(os.path.join(root, path))
+        stamps[path] = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(path)
+        if entry and entry['stat'] == stamps[path]:
+            files[path] = entry
+            stats['unchanged'] += 1
+        else:
+            file_jobs.append((root, path, entry['hash'] if entry else None, custom_names))
+
+    if jobs == 1 or len(file_jobs) < 2:
+        results = list(map(scan_source, file_jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(scan_source, file_jobs,
+                                    chunksize=max(1, len(file_jobs) // (4 * (os.cpu_count() or 1)))))
+    for path, digest, refs in results:
+        if refs is None:
+            refs = cached[path]['refs']
+            stats['same_content'] += 1
+        else:
+            stats['scanned'] += 1
+        files[path] = {'stat': stamps[path], 'hash': digest, 'refs': refs}
+
+    if cache_path and (file_jobs or len(files) != len(cached)):
+        save_cache(cache_path, signature, files)
+    return {path: entry['refs'] for path, entry in files.items()}, stats
+
+
+# ── grouping ────────────────────────────────────────────────────────────────
+
+def derive_id(name):
+    kind = icon_type(name)
+    if kind == 'asset':
+        stem = os.path.splitext(os.path.basename(name))[0]
+    else:
+        stem = name.rsplit('.', 1)[-1]
+    stem = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', stem).lower()
+    return f"{kind}_{re.sub(r'[^0-9a-z]+', '_', stem).strip('_')}"
+
+
+def derive_group(paths):
+    """Feature group of the directory most of an icon's usages live in."""
+    votes = Counter()
+    for path in paths:
+        parts = path.split('/')
+        if len(parts) > 3 and parts[1] in ('screens', 'widgets', 'components'):
+            votes[DIR_GROUPS.get(parts[2], DEFAULT_GROUP)] += 1
+        else:
+            votes[DEFAULT_GROUP] += 1
+    return votes.most_common(1)[0][0] if votes else DEFAULT_GROUP
+
+
+def _pick_row(rows, path, line):
+    """The row listing path (at line, if several do), or None if none lists it."""
+    listing = [row for row in rows if any(f['path'] == path for f in row['files'])]
+    for row in listing:
+        for f in row['files']:
+            if f['path'] == path and any(s <= line <= e for s, e in f['lines']):
+                return row
+    return listing[0] if listing else None
+
+
+def build_inventory(refs_by_path, rows=()):
+    """Group scanned usages into inventory icons.
+
+    Every markdown row comes first, in markdown order, with the usages in
+    its files (none if lib/ no longer has any); then the unassigned usages
+    of known icons and the icons the markdown does not know, sorted by id.
+    Returns (icons, unused_row_ids).
+    """
+    rows_by_name = defaultdict(list)
+    for row in rows:
+        for name in icon_names(row['current']):
+            rows_by_name[name].append(row)
+
+    # id -> {'row': row or None, 'names': set, 'files': {path: [[l, l], ...]}}
+    groups = {}
+    for path in sorted(refs_by_path):
+        for name, lines in refs_by_path[path].items():
+            for line in lines:
+                candidates = rows_by_name.get(name)
+                row = _pick_row(candidates, path, line) if candidates else None
+                if row is not None:
+                    icon_id = row['id']
+                elif candidates:
+                    icon_id = derive_id(name) + '_unassigned'
+                else:
+                    icon_id = derive_id(name)
+                group = groups.setdefault(icon_id, {'row': row, 'names': set(), 'files': {}})
+                group['names'].add(name)
+                group['files'].setdefault(path, []).append([line, line])
+
+    icons, unused = [], []
+    for row in rows:
+        group = groups.pop(row['id'], None)
+        if group is None:
+            unused.append(row['id'])
+            icons.append(_icon(row['id'], row['type'], [row['current']], {},
+                               row['context'], row['description'], row['feature_group']))
+            continue
+        names = [n for n in icon_names(row['current']) if n in group['names']]
+        order = {n: i for i, n in enumerate(row['current'].split(' / '))}
+        names.sort(key=lambda n: order.get(n, len(order)))
+        icons.append(_icon(row['id'], row['type'], names, group['files'],
+                           row['context'], row['description'], row['feature_group']))
+    for icon_id in sorted(groups):
+        group = groups[icon_id]
+        names = sorted(group['names'])
+        context = UNASSIGNED_CONTEXT if icon_id.endswith('_unassigned') else ''
+        icons.append(_icon(icon_id, icon_type(names[0]), names, group['files'],
+                           context, '', derive_group(group['files'])))
+    return icons, unused
+
+
+def _icon(icon_id, kind, names, files, context, description, feature_group):
+    return {
+        'id': icon_id,
+        'type': kind,
+        'current': ' / '.join(names),
+        'files': [{'path': path, 'lines': merge_ranges(lines)}
+                  for path, lines in sorted(files.items())],
+        'context': context,
+        'description': description,
+        'feature_group': feature_group,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the icon inventory from lib/')
+    parser.add_argument('--root', default='.',
+                        help='Repository root (default: current directory)')
+    parser.add_argument('--markdown', default=DEFAULT_INPUT,
+                        help=f'Inventory to take ids/context/description from '
+                             f'(default: {DEFAULT_INPUT})')
+    parser.add_argument('--no-markdown', action='store_true',
+                        help='Derive every id and feature group from the sources')
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument('--output', default=None,
+                             help=f'Output file (default: {GENERATED_OUTPUT}, '
+                                  'or .ndjson next to it with --ndjson)')
+    destination.add_argument('--write', action='store_true',
+                             help=f'Replace {DEFAULT_OUTPUT} (.ndjson with --ndjson)')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Write newline-delimited JSON, one icon per line')
+    parser.add_argument('--expanded-lines', action='store_true',
+                        help='Write lines as flat lists (legacy ICON_INVENTORY.json shape)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update {CACHE_PATH}')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count; 1 disables the pool)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = [] if args.no_markdown else parse_markdown_to_json(
+        os.path.join(args.root, args.markdown))
+    custom_names = {n for row in rows for n in icon_names(row['current'])
+                    if icon_type(n) == 'custom' and IDENTIFIER.match(n)}
+    cache_path = None if args.no_cache else os.path.join(args.root, CACHE_PATH)
+    refs_by_path, stats = scan_tree(args.root, custom_names, cache_path, args.jobs)
+    icons, unused = build_inventory(refs_by_path, rows)
+    if args.expanded_lines:
+        for icon in icons:
+            for f in icon['files']:
+                f['lines'] = expand_ranges(f['lines'])
+
+    output = args.output or (DEFAULT_OUTPUT if args.write else GENERATED_OUTPUT)
+    if args.ndjson and not args.output:
+        output = output[:-len('.json')] + '.ndjson'
+    with open(output, 'w', encoding='utf-8') as f:
+        count = (write_ndjson if args.ndjson else write_json_array)(icons, f)
+    elapsed = time.perf_counter() - start
+
+    unassigned = sum(1 for icon in icons if icon['id'].endswith('_unassigned'))
+    known = len(rows)
+    print(f"Scanned {stats['files']} Dart files in {elapsed:.2f}s "
+          f"({stats['scanned']} scanned, {stats['same_content']} unchanged content, "
+          f"{stats['unchanged']} unchanged on disk)")
+    print(f"Successfully generated {count} icons to {output} "
+          f"({known} markdown rows, {unassigned} unassigned, "
+          f"{count - known - unassigned} new)")
+    if unused:
+        print(f"{len(unused)} markdown rows list no file with a usage in {SOURCE_DIR}/ "
+              f"(\"Multiple files\" rows, or the icon moved): {', '.join(unused)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,129 +1,310 @@
 #!/usr/bin/env python3
-"""Parse ICON_INVENTORY.md and convert to JSON format."""
+"""Parse ICON_INVENTORY.md and convert to JSON format.
 
+Icons are yielded one table row at a time while the markdown is read, and can
+be written as a JSON array or as NDJSON (one icon per line).
+
+Line references are stored as compact, merged [start, end] ranges:
+"main_nav.dart:152-153, 183-184" becomes {"lines": [[152, 153], [183, 184]]}.
+--expanded-lines writes the original shape ({"lines": [152, 153, 183, 184]})
+for existing ICON_INVENTORY.json consumers.
+
+--sqlite writes an indexed SQLite database instead, for
+tooling/query_icon_inventory.py:
+
+    icons        one row per icon (FTS5 index icons_fts over context/description)
+    icon_names   icon name -> icon id (e.g. Icons.home_outlined -> nav_home)
+    usages       icon id, path, file name, line range; indexed by path,
+                 file name and icon id for reverse file lookups
+
+Usage:
+    python3 tooling/parse_icon_inventory.py [--input PATH] [--output PATH]
+                                            [--ndjson] [--expanded-lines]
+                                            [--sqlite [PATH]]
+"""
+
+import argparse
 import json
+import os
 import re
+import sqlite3
+
+DEFAULT_INPUT = 'docs/ICON_INVENTORY.md'
+DEFAULT_OUTPUT = 'docs/ICON_INVENTORY.json'
+DEFAULT_SQLITE = 'docs/ICON_INVENTORY.sqlite'
+SQLITE_SCHEMA_VERSION = 1
+
+ICON_NAME = re.compile(r'\b(?:CupertinoIcons|Icons)\.\w+')
+
+# "177" or "177-178"
+LINE_SPEC = re.compile(r'^(\d+)(?:\s*-\s*(\d+))?$')
+
+
+def parse_line_spec(line_info):
+    """Return (start, end) for "177" / "177-178", or None if not a line spec."""
+    match = LINE_SPEC.match(line_info.strip())
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    return (start, end) if start <= end else (end, start)
+
+
+def merge_ranges(ranges):
+    """Sort and coalesce overlapping/adjacent [start, end] ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def expand_ranges(ranges):
+    """[[152, 153], [183, 184]] -> [152, 153, 183, 184]."""
+    return [line for start, end in ranges for line in range(start, end + 1)]
+
+
+def icon_names(current):
+    """Names to look for: Icons.*/CupertinoIcons.*, else the "/"-separated tokens."""
+    names = ICON_NAME.findall(current)
+    if not names:
+        names = [t.strip() for t in current.split('/') if t.strip()]
+    return sorted(set(names))
 
-def parse_files_column(screens_files):
-    """Parse the Screens/Files column into structured file data."""
+
+def parse_files_column(screens_files, expanded=False):
+    """Parse the Screens/Files column into structured file data.
+
+    A bare line spec after a path ("main_nav.dart:152-153, 183-184") belongs
+    to the preceding path. Lines are [start, end] ranges, or flat line lists
+    with expanded=True.
+    """
     files = []
-    
+
     if not screens_files or screens_files == '-' or screens_files.startswith('Multiple'):
         return files
-    
+
+    last_path = None
     # Split by comma to handle multiple files
     for file_part in screens_files.split(','):
         file_part = file_part.strip()
-        
+
         if not file_part:
             continue
-            
+
+        # Continuation - just line numbers for the previous file
+        span = parse_line_spec(file_part)
+        if span is not None and last_path is not None:
+            existing = next((f for f in files if f['path'] == last_path), None)
+            if existing is None:
+                existing = {'path': last_path, 'lines': []}
+                files.append(existing)
+            existing['lines'] = merge_ranges(existing['lines'] + [list(span)])
+            continue
+
         # Check if there's a line number
         if ':' in file_part:
             # Split path and line info
-            parts = file_part.rsplit(':', 1)
-            path = parts[0].strip()
-            line_info = parts[1].strip()
-            
-            # Handle line ranges (e.g., "177-178")
-            if '-' in line_info:
-                try:
-                    start, end = map(int, line_info.split('-'))
-                    files.append({
-                        'path': path,
-                        'lines': list(range(start, end + 1))
-                    })
-                except ValueError:
-                    # If parsing fails, just add the path
-                    files.append({'path': path, 'lines': []})
-            else:
-                # Single line number
-                try:
-                    line_num = int(line_info)
-                    files.append({
-                        'path': path,
-                        'lines': [line_num]
-                    })
-                except ValueError:
-                    # If parsing fails, just add the path
-                    files.append({'path': path, 'lines': []})
+            path, line_info = (p.strip() for p in file_part.rsplit(':', 1))
+            span = parse_line_spec(line_info)
+            # If parsing fails, just add the path
+            files.append({'path': path, 'lines': [list(span)] if span else []})
         else:
             # No line number, just path
-            if file_part.strip():
-                files.append({
-                    'path': file_part.strip(),
-                    'lines': []
-                })
-    
+            path = file_part
+            files.append({'path': path, 'lines': []})
+        last_path = path
+
+    if expanded:
+        for f in files:
+            f['lines'] = expand_ranges(f['lines'])
     return files
 
-def parse_markdown_to_json(markdown_path):
-    """Parse the markdown inventory file and convert to JSON."""
-    icons = []
+
+def iter_icons(lines, expanded=False):
+    """Yield icon dicts from an iterable of markdown lines as they are read."""
     current_group = None
     in_table = False
-    
-    with open(markdown_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
+    skip_separator = False
+
+    for raw in lines:
+        line = raw.strip()
+
+        if skip_separator:
+            skip_separator = False
+            continue
+
+        # Check if we're leaving the table (empty line or new section)
+        if in_table and (not line or line.startswith('##')):
+            in_table = False
+
         # Check for feature group header
         if line.startswith('## ') and not line.startswith('## Summary') and not line.startswith('## High Priority'):
             current_group = line[3:].strip()
             in_table = False
-            i += 1
             continue
-        
+
         # Check for table header
         if '| ID |' in line:
             in_table = True
-            i += 2  # Skip header and separator line
+            skip_separator = True
             continue
-        
-        # Check if we're leaving the table (empty line or new section)
-        if in_table and (not line or line.startswith('##')):
-            in_table = False
-            if line.startswith('##'):
-                i -= 1  # Re-process this line as a header
-            i += 1
-            continue
-        
+
         # Parse table row
         if in_table and line.startswith('|') and not line.startswith('|---'):
             parts = [p.strip() for p in line.split('|')[1:-1]]
-            
+
             if len(parts) >= 7:
-                icon_id = parts[0]
-                icon_type = parts[1]
-                current_icon = parts[2]
-                asset_path = parts[3] if parts[3] != '-' else ''
-                screens_files = parts[4]
-                context = parts[5]
-                description = parts[6]
-                
-                files = parse_files_column(screens_files)
-                
-                icons.append({
-                    'id': icon_id,
-                    'type': icon_type,
-                    'current': current_icon,
-                    'files': files,
-                    'context': context,
-                    'description': description,
+                yield {
+                    'id': parts[0],
+                    'type': parts[1],
+                    'current': parts[2],
+                    'files': parse_files_column(parts[4], expanded),
+                    'context': parts[5],
+                    'description': parts[6],
                     'feature_group': current_group
-                })
-        
-        i += 1
-    
-    return icons
+                }
+
+
+def iter_markdown_icons(markdown_path, expanded=False):
+    """Stream icons from the markdown inventory file."""
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        yield from iter_icons(f, expanded)
+
+
+def parse_markdown_to_json(markdown_path, expanded=False):
+    """Parse the markdown inventory file and convert to JSON."""
+    return list(iter_markdown_icons(markdown_path, expanded))
+
+
+def write_json_array(icons, out):
+    """Write icons as an indented JSON array without holding them all in memory.
+
+    Output is byte-identical to json.dump(list(icons), out, indent=2).
+    """
+    count = 0
+    for icon in icons:
+        body = json.dumps(icon, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        out.write(('[\n  ' if count == 0 else ',\n  ') + body)
+        count += 1
+    out.write('\n]' if count else '[]')
+    return count
+
+
+def write_ndjson(icons, out):
+    """Write one JSON object per line."""
+    count = 0
+    for icon in icons:
+        out.write(json.dumps(icon, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE icons (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    type TEXT,
+    current TEXT,
+    context TEXT,
+    description TEXT,
+    feature_group TEXT
+);
+CREATE TABLE icon_names (name TEXT NOT NULL, icon_id TEXT NOT NULL);
+CREATE TABLE usages (
+    icon_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    start_line INTEGER,
+    end_line INTEGER
+);
+CREATE VIRTUAL TABLE icons_fts USING fts5(
+    context, description, content='icons', content_rowid='rowid'
+);
+"""
+
+SQLITE_INDEXES = """
+CREATE INDEX icon_names_name ON icon_names (name);
+CREATE INDEX icon_names_icon ON icon_names (icon_id);
+CREATE INDEX usages_path ON usages (path);
+CREATE INDEX usages_file_name ON usages (file_name);
+CREATE INDEX usages_icon ON usages (icon_id);
+CREATE INDEX icons_feature_group ON icons (feature_group COLLATE NOCASE);
+"""
+
+
+def write_sqlite(icons, db_path):
+    """Write icons to a fresh SQLite database at db_path; return the count.
+
+    Rows are inserted as icons stream in; indexes and the FTS index are built
+    once at the end. The file is replaced atomically.
+    """
+    tmp = db_path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SQLITE_SCHEMA)
+        count = 0
+        for icon in icons:
+            conn.execute(
+                'INSERT INTO icons (id, type, current, context, description, feature_group) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (icon['id'], icon['type'], icon['current'], icon['context'],
+                 icon['description'], icon['feature_group']))
+            conn.executemany('INSERT INTO icon_names VALUES (?, ?)',
+                             [(name, icon['id']) for name in icon_names(icon['current'])])
+            for f in icon['files']:
+                spans = [tuple(r) if isinstance(r, list) else (r, r) for r in f['lines']]
+                conn.executemany(
+                    'INSERT INTO usages VALUES (?, ?, ?, ?, ?)',
+                    [(icon['id'], f['path'], f['path'].rsplit('/', 1)[-1], s, e)
+                     for s, e in spans or [(None, None)]])
+            count += 1
+        conn.executescript(SQLITE_INDEXES)
+        conn.execute("INSERT INTO icons_fts (icons_fts) VALUES ('rebuild')")
+        conn.execute('INSERT INTO meta VALUES (?, ?)',
+                     ('schema_version', str(SQLITE_SCHEMA_VERSION)))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert ICON_INVENTORY.md to JSON')
+    parser.add_argument('--input', default=DEFAULT_INPUT,
+                        help=f'Markdown inventory (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output', default=None,
+                        help=f'Output file (default: {DEFAULT_OUTPUT}, '
+                             'or .ndjson next to it with --ndjson)')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Write newline-delimited JSON, one icon per line')
+    parser.add_argument('--expanded-lines', action='store_true',
+                        help='Write lines as flat lists (legacy ICON_INVENTORY.json shape)')
+    parser.add_argument('--sqlite', nargs='?', const=DEFAULT_SQLITE, default=None,
+                        metavar='PATH',
+                        help=f'Write an indexed SQLite database instead of JSON '
+                             f'(default path: {DEFAULT_SQLITE})')
+    args = parser.parse_args()
+
+    if args.sqlite:
+        count = write_sqlite(iter_markdown_icons(args.input), args.sqlite)
+        print(f"Successfully indexed {count} icons to {args.sqlite}")
+        return
+
+    output = args.output or (DEFAULT_OUTPUT[:-len('.json')] + '.ndjson'
+                             if args.ndjson else DEFAULT_OUTPUT)
+    icons = iter_markdown_icons(args.input, args.expanded_lines)
+    with open(output, 'w', encoding='utf-8') as f:
+        count = (write_ndjson if args.ndjson else write_json_array)(icons, f)
+
+    print(f"Successfully parsed {count} icons to {output}")
+
 
 if __name__ == '__main__':
-    icons = parse_markdown_to_json('docs/ICON_INVENTORY.md')
-    
-    with open('docs/ICON_INVENTORY.json', 'w', encoding='utf-8') as f:
-        json.dump(icons, f, indent=2, ensure_ascii=False)
-    
-    print(f"Successfully parsed {len(icons)} icons to docs/ICON_INVENTORY.json")
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Query the SQLite icon inventory written by parse_icon_inventory.py --sqlite.
+
+Usage:
+    python3 tooling/query_icon_inventory.py [--db PATH] [--json] COMMAND ARGS
+
+Commands:
+    file PATH       Icons used in a file. A bare name ("main_nav.dart") matches
+                    any directory; a path matches exactly or as a suffix.
+    icon NAME       Usages of an icon name (Icons.home_outlined) or inventory id.
+    search TEXT     Full-text search over context/description. Words are
+                    ANDed ("bottom nav"); --raw passes TEXT as an FTS5 query.
+    group NAME      Icons in a feature group (e.g. Navigation).
+
+Examples:
+    python3 tooling/query_icon_inventory.py file main_nav.dart
+    python3 tooling/query_icon_inventory.py search bottom nav
+    python3 tooling/query_icon_inventory.py icon Icons.add
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from parse_icon_inventory import DEFAULT_SQLITE
+
+ICON_COLUMNS = 'i.id, i.type, i.current, i.context, i.description, i.feature_group'
+
+
+def _rows(conn, sql, params):
+    conn.row_factory = sqlite3.Row
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def query_file(conn, path):
+    if '/' in path:
+        where, params = 'u.path = ? OR (u.file_name = ? AND u.path LIKE ?)', (
+            path, path.rsplit('/', 1)[-1], '%/' + path)
+    else:
+        where, params = 'u.file_name = ?', (path,)
+    return _rows(conn, f"""
+        SELECT {ICON_COLUMNS}, u.path, u.start_line, u.end_line
+        FROM usages u JOIN icons i ON i.id = u.icon_id
+        WHERE {where}
+        ORDER BY u.path, u.start_line, i.id""", params)
+
+
+def query_icon(conn, name):
+    return _rows(conn, f"""
+        SELECT {ICON_COLUMNS}, u.path, u.start_line, u.end_line
+        FROM icons i LEFT JOIN usages u ON u.icon_id = i.id
+        WHERE i.id = ? OR i.id IN (SELECT icon_id FROM icon_names WHERE name = ?)
+        ORDER BY i.id, u.path, u.start_line""", (name, name))
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching all of its words."""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def query_search(conn, text, raw=False):
+    return _rows(conn, f"""
+        SELECT {ICON_COLUMNS}
+        FROM icons_fts JOIN icons i ON i.rowid = icons_fts.rowid
+        WHERE icons_fts MATCH ?
+        ORDER BY rank""", (text if raw else fts_query(text),))
+
+
+def query_group(conn, group):
+    return _rows(conn, f"""
+        SELECT {ICON_COLUMNS}
+        FROM icons i WHERE i.feature_group = ? COLLATE NOCASE
+        ORDER BY i.rowid""", (group,))
+
+
+def _format(row):
+    text = f"{row['id']:32} {row['current']}"
+    if row.get('path'):
+        lines = ''
+        if row['start_line'] is not None:
+            lines = (f":{row['start_line']}" if row['start_line'] == row['end_line']
+                     else f":{row['start_line']}-{row['end_line']}")
+        text += f"  {row['path']}{lines}"
+    elif row.get('context'):
+        text += f"  — {row['context']}"
+    return text
+
+
+def _stdout_closed():
+    # Python flushes stdout again at exit; point it at devnull so that flush
+    # cannot raise a second BrokenPipeError.
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the SQLite icon inventory')
+    parser.add_argument('--db', default=DEFAULT_SQLITE,
+                        help=f'Database (default: {DEFAULT_SQLITE})')
+    parser.add_argument('--json', action='store_true', help='Print rows as JSON')
+    parser.add_argument('--raw', action='store_true',
+                        help='search: pass TEXT to FTS5 unchanged')
+    parser.add_argument('command', choices=('file', 'icon', 'search', 'group'))
+    parser.add_argument('text', nargs='+')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"{args.db} not found; build it with "
+              f"python3 tooling/parse_icon_inventory.py --sqlite", file=sys.stderr)
+        sys.exit(2)
+
+    text = ' '.join(args.text)
+    start = time.perf_counter()
+    conn = sqlite3.connect(f'file:{args.db}?mode=ro', uri=True)
+    try:
+        if args.command == 'file':
+            rows = query_file(conn, text)
+        elif args.command == 'icon':
+            rows = query_icon(conn, text)
+        elif args.command == 'search':
+            rows = query_search(conn, text, args.raw)
+        else:
+            rows = query_group(conn, text)
+    except sqlite3.OperationalError as e:
+        print(f"Query failed: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+
+    try:
+        if args.json:
+            print(json.dumps(rows, indent=2, ensure_ascii=False))
+        else:
+            for row in rows:
+                print(_format(row))
+            print(f"\n{len(rows)} row(s) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    except BrokenPipeError:
+        # The reader (head, less, grep -m) quit early; stop quietly.
+        _stdout_closed()
+    sys.exit(0 if rows else 1)
+
+
+if __name__ == '__main__':
+    main()
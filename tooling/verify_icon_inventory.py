@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Verify ICON_INVENTORY.md against the Dart source tree.
+
+Every "path:lines" reference in the inventory claims that the row's icon
+(e.g. Icons.home_outlined) is used on those lines. Entries are grouped by
+file and each referenced file is memory-mapped and scanned once, across a
+process pool. Each reference is reported as:
+
+    ok       an icon of the row appears on (one of) the stated lines
+    moved    the icon is still in the file, but elsewhere (new lines suggested)
+    missing  the file exists but no longer uses the icon
+    stale    the referenced file no longer exists
+
+Rows without file references ("Multiple files", "-") or without an icon name
+(a blank or "/" Current column) cannot be verified and are only counted.
+
+Usage:
+    python3 tooling/verify_icon_inventory.py [--input PATH] [--root DIR]
+                                             [--json PATH] [--jobs N]
+
+Exit codes:
+    0 — every reference verified
+    1 — moved, missing or stale references found
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from parse_icon_inventory import (
+    DEFAULT_INPUT,
+    icon_names,
+    merge_ranges,
+    parse_markdown_to_json,
+)
+
+STATUSES = ('ok', 'moved', 'missing', 'stale')
+# Suggested line ranges listed per moved reference.
+MAX_SUGGESTIONS = 3
+
+
+def scan_file(job):
+    """Worker: return (path, {name: [line, ...]}) or (path, None) if missing.
+
+    job is (root, path, names). The file is memory-mapped and matched once
+    against an alternation of every name referenced in it.
+    """
+    root, path, names = job
+    full_path = os.path.join(root, path)
+    found = {name: [] for name in names}
+    try:
+        with open(full_path, 'rb') as f:
+            if not names or os.fstat(f.fileno()).st_size == 0:
+                return path, found
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                newlines = [m.start() for m in re.finditer(rb'\n', mm)]
+                alternation = b'|'.join(re.escape(n.encode('utf-8'))
+                                        for n in sorted(names, key=len, reverse=True))
+                pattern = re.compile(rb'(?<![\w.])(?:' + alternation + rb')(?!\w)')
+                for m in pattern.finditer(mm):
+                    line = bisect_right(newlines, m.start() - 1) + 1
+                    found[m.group().decode('utf-8')].append(line)
+    except (FileNotFoundError, IsADirectoryError):
+        return path, None
+    return path, found
+
+
+def _distance(line, ranges):
+    return min(0 if s <= line <= e else min(abs(line - s), abs(line - e))
+               for s, e in ranges)
+
+
+def _format_ranges(ranges):
+    return ', '.join(str(s) if s == e else f'{s}-{e}' for s, e in ranges)
+
+
+def classify(ref, found):
+    """Return (status, suggested_ranges) for one inventory reference."""
+    if found is None:
+        return 'stale', []
+    lines = sorted({line for name in ref['names'] for line in found.get(name, [])})
+    if not lines:
+        return 'missing', []
+    if not ref['lines']:
+        return 'ok', []
+    if all(any(s <= line <= e for line in lines) for s, e in ref['lines']):
+        return 'ok', []
+    nearest = sorted(lines, key=lambda line: _distance(line, ref['lines']))
+    suggested = merge_ranges([[line, line] for line in nearest[:MAX_SUGGESTIONS * 2]])
+    return 'moved', suggested[:MAX_SUGGESTIONS]
+
+
+def verify(icons, root='.', jobs=None):
+    """Return (results, unverifiable): results is a list of reference dicts."""
+    refs_by_file = defaultdict(list)
+    unverifiable = 0
+    for icon in icons:
+        names = icon_names(icon['current'])
+        if not icon['files'] or not names:
+            unverifiable += 1
+            continue
+        for f in icon['files']:
+            refs_by_file[f['path']].append({
+                'id': icon['id'], 'path': f['path'],
+                'lines': f['lines'], 'names': names,
+            })
+
+    file_jobs = [
+        (root, path, sorted({n for ref in refs for n in ref['names']}))
+        for path, refs in refs_by_file.items()
+    ]
+    if jobs == 1:
+        scanned = dict(map(scan_file, file_jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = dict(pool.map(scan_file, file_jobs,
+                                    chunksize=max(1, len(file_jobs) // (4 * (os.cpu_count() or 1)))))
+
+    results = []
+    for path, refs in refs_by_file.items():
+        for ref in refs:
+            status, suggested = classify(ref, scanned[path])
+            results.append({**ref, 'status': status, 'suggested': suggested})
+    return results, unverifiable
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify ICON_INVENTORY.md against lib/')
+    parser.add_argument('--input', default=DEFAULT_INPUT,
+                        help=f'Markdown inventory (default: {DEFAULT_INPUT})')
+    parser.add_argument('--root', default='.',
+                        help='Repository root the inventory paths are relative to')
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help='Also write the full result as JSON')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count; 1 disables the pool)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    icons = parse_markdown_to_json(args.input)
+    results, unverifiable = verify(icons, args.root, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    by_status = defaultdict(list)
+    for r in results:
+        by_status[r['status']].append(r)
+
+    for status in STATUSES[1:]:
+        entries = by_status[status]
+        if not entries:
+            continue
+        print(f"\n{status.upper()} ({len(entries)})")
+        for r in sorted(entries, key=lambda r: (r['path'], r['id'])):
+            where = f"{r['path']}:{_format_ranges(r['lines'])}" if r['lines'] else r['path']
+            hint = f" -> suggested {_format_ranges(r['suggested'])}" if r['suggested'] else ''
+            print(f"  {r['id']:32} {where}{hint}")
+
+    counts = ', '.join(f"{len(by_status[s])} {s}" for s in STATUSES)
+    print(f"\nVerified {len(results)} references in "
+          f"{len({r['path'] for r in results})} files in {elapsed:.2f}s: {counts}; "
+          f"{unverifiable} icons without file references.")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'unverifiable': unverifiable, 'results': results}, f,
+                      indent=2, ensure_ascii=False)
+
+    sys.exit(1 if any(by_status[s] for s in STATUSES[1:]) else 0)
+
+
+if __name__ == '__main__':
+    main()